@@ -18,11 +18,25 @@ def cli():
     Usage:
         python app.py run
         python app.py init-db
+        python app.py prune-history
+        python app.py backup [dest]
+        python app.py maintain [--convert]
+        python app.py loadtest [--users N] [--threads N] [--duration S] [--mix ...] [--url URL]
+        python app.py compress-static
+        python app.py build-assets
+        python app.py profile [seconds] [url] [outfile]
     """
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python app.py run")
         print("  python app.py init-db")
+        print("  python app.py prune-history")
+        print("  python app.py backup [dest]")
+        print("  python app.py maintain [--convert]")
+        print("  python app.py loadtest [--users N] [--threads N] [--duration S] [--mix ...] [--url URL]")
+        print("  python app.py compress-static")
+        print("  python app.py build-assets")
+        print("  python app.py profile [seconds] [url] [outfile]")
         return
 
     command = sys.argv[1].lower()
@@ -33,12 +47,86 @@ def cli():
         print("Database initialized successfully.")
         return
 
+    if command == "prune-history":
+        from app_modules.revisions import prune_revisions
+        with app.app_context():
+            deleted = prune_revisions(
+                app.config["REVISION_KEEP_DAYS"], app.config["REVISION_KEEP_MIN"]
+            )
+        print(f"Pruned {deleted} note revisions.")
+        return
+
+    if command == "backup":
+        from app_modules.backup import backup_database
+        # Trailing separator: BACKUP_DIR is a directory even before it exists
+        dest = sys.argv[2] if len(sys.argv) > 2 else os.path.join(app.config["BACKUP_DIR"], "")
+        path = backup_database(
+            app.config["DATABASE"],
+            dest,
+            pages=app.config["BACKUP_PAGES_PER_STEP"],
+            pause=app.config["BACKUP_STEP_PAUSE"],
+            keep=app.config["BACKUP_KEEP"],
+        )
+        print(f"Backup written to {path}")
+        return
+
+    if command == "maintain":
+        from app_modules.maintenance import run_maintenance
+        run_maintenance(
+            app.config["DATABASE"],
+            pages_per_step=app.config["MAINTAIN_PAGES_PER_STEP"],
+            pause=app.config["MAINTAIN_STEP_PAUSE"],
+            convert="--convert" in sys.argv[2:],
+        )
+        return
+
+    if command == "loadtest":
+        from app_modules.loadtest import main as loadtest_main
+        loadtest_main(sys.argv[2:])
+        return
+
+    if command == "compress-static":
+        from app_modules.compression import precompress_static
+        written = precompress_static(app.static_folder)
+        print(f"Wrote {written} precompressed static files.")
+        return
+
+    if command == "build-assets":
+        from app_modules.assets import build_assets, DIST_DIR
+        from app_modules.compression import precompress_static
+        build_assets(app.static_folder)
+        precompress_static(os.path.join(app.static_folder, DIST_DIR))
+        print("Assets built.")
+        return
+
+    if command == "profile":
+        import urllib.request
+        seconds = sys.argv[2] if len(sys.argv) > 2 else "10"
+        url = sys.argv[3] if len(sys.argv) > 3 else "http://127.0.0.1:5000"
+        out = sys.argv[4] if len(sys.argv) > 4 else None
+
+        req = urllib.request.Request(
+            f"{url.rstrip('/')}/debug/profile?seconds={seconds}",
+            headers={"X-Profile-Token": app.config["PROFILE_TOKEN"]},
+        )
+        with urllib.request.urlopen(req, timeout=float(seconds) + 30) as resp:
+            samples = resp.headers.get("X-Profile-Samples")
+            body = resp.read().decode("utf-8")
+
+        if out:
+            with open(out, "w", encoding="utf-8") as fh:
+                fh.write(body)
+            print(f"{samples} samples written to {out}")
+        else:
+            print(body, end="")
+        return
+
     if command == "run":
         app.run(host="0.0.0.0", port=5000)
         return
 
     print(f"Unknown command: {command}")
-    print("Available commands: run, init-db")
+    print("Available commands: run, init-db, prune-history, backup, maintain, loadtest, compress-static, build-assets, profile")
 
 if __name__ == "__main__":
     cli()
@@ -1,11 +1,13 @@
 # app_modules/__init__.py
 
 import os
+import atexit
 import sqlite3
 from flask import Flask, g, current_app, redirect, url_for, render_template
 from flask_login import LoginManager, current_user
 
 from config import Config  # import project-wide paths
+from .writer import enable_wal
 
 # Flask-Login manager
 login_manager = LoginManager()
@@ -24,6 +26,7 @@ def get_db():
             detect_types=sqlite3.PARSE_DECLTYPES,
         )
         g.db.row_factory = sqlite3.Row
+        enable_wal(g.db)
     return g.db
 
 
@@ -34,6 +37,11 @@ def close_db(e=None):
         db.close()
 
 
+def get_writer():
+    """Return the app-wide WriteQueue that serializes all DB mutations."""
+    return current_app.extensions["writer"]
+
+
 def init_db():
     """Initialize DB schema using models.create_tables()."""
     from .models import create_tables
@@ -64,7 +72,50 @@ def create_app(test_config=None):
     app.config.from_mapping(
         SECRET_KEY=os.environ.get("SECRET_KEY", "dev-change-me"),
         DATABASE=os.path.join(Config.INSTANCE_DIR, "notes.db"),
-        DEBUG=True
+        DEBUG=True,
+        WRITER_MAX_BATCH=Config.WRITER_MAX_BATCH,
+        WRITER_MAX_LATENCY_MS=Config.WRITER_MAX_LATENCY_MS,
+        WRITER_RESULT_TIMEOUT=Config.WRITER_RESULT_TIMEOUT,
+        SUGGEST_MAX_USERS=Config.SUGGEST_MAX_USERS,
+        SUGGEST_IDLE_SECONDS=Config.SUGGEST_IDLE_SECONDS,
+        SUGGEST_LIMIT=Config.SUGGEST_LIMIT,
+        RELATED_MAX_USERS=Config.RELATED_MAX_USERS,
+        RELATED_IDLE_SECONDS=Config.RELATED_IDLE_SECONDS,
+        RELATED_TOP_K=Config.RELATED_TOP_K,
+        REVISION_SNAPSHOT_INTERVAL=Config.REVISION_SNAPSHOT_INTERVAL,
+        REVISION_KEEP_DAYS=Config.REVISION_KEEP_DAYS,
+        REVISION_KEEP_MIN=Config.REVISION_KEEP_MIN,
+        RATE_LIMIT_ENABLED=Config.RATE_LIMIT_ENABLED,
+        RATE_LIMIT_RATE=Config.RATE_LIMIT_RATE,
+        RATE_LIMIT_BURST=Config.RATE_LIMIT_BURST,
+        RATE_LIMIT_COSTS=Config.RATE_LIMIT_COSTS,
+        RATE_LIMIT_BACKEND=None,
+        BACKUP_DIR=Config.BACKUP_DIR,
+        BACKUP_KEEP=Config.BACKUP_KEEP,
+        BACKUP_PAGES_PER_STEP=Config.BACKUP_PAGES_PER_STEP,
+        BACKUP_STEP_PAUSE=Config.BACKUP_STEP_PAUSE,
+        BACKUP_INTERVAL_SECONDS=Config.BACKUP_INTERVAL_SECONDS,
+        JOBS_MAX_WORKERS=Config.JOBS_MAX_WORKERS,
+        JOBS_PER_USER=Config.JOBS_PER_USER,
+        SYNC_INLINE_LIMIT=Config.SYNC_INLINE_LIMIT,
+        SYNC_CHUNK_SIZE=Config.SYNC_CHUNK_SIZE,
+        MAINTAIN_PAGES_PER_STEP=Config.MAINTAIN_PAGES_PER_STEP,
+        MAINTAIN_STEP_PAUSE=Config.MAINTAIN_STEP_PAUSE,
+        COMPRESS_ENABLED=Config.COMPRESS_ENABLED,
+        COMPRESS_MIN_SIZE=Config.COMPRESS_MIN_SIZE,
+        COMPRESS_LEVEL=Config.COMPRESS_LEVEL,
+        STATIC_MAX_AGE=Config.STATIC_MAX_AGE,
+        ATTACHMENTS_DIR=Config.ATTACHMENTS_DIR,
+        ATTACHMENT_MAX_SIZE=Config.ATTACHMENT_MAX_SIZE,
+        MAX_CONTENT_LENGTH=Config.MAX_CONTENT_LENGTH,
+        USE_X_SENDFILE=Config.USE_X_SENDFILE,
+        ADMIN_USERNAMES=Config.ADMIN_USERNAMES,
+        PROFILE_TOKEN=Config.PROFILE_TOKEN,
+        PROFILE_MAX_SECONDS=Config.PROFILE_MAX_SECONDS,
+        PROFILE_INTERVAL=Config.PROFILE_INTERVAL,
+        DASHBOARD_STREAMING=Config.DASHBOARD_STREAMING,
+        DASHBOARD_STREAM_CHUNK=Config.DASHBOARD_STREAM_CHUNK,
+        MARKDOWN_CACHE_SIZE=Config.MARKDOWN_CACHE_SIZE,
     )
 
     # Apply test overrides (used in app.py)
@@ -77,15 +128,96 @@ def create_app(test_config=None):
     # Teardown DB after request
     app.teardown_appcontext(close_db)
 
+    # Single writer thread with group commit for all mutations
+    from .writer import WriteQueue
+    writer = WriteQueue(
+        app.config["DATABASE"],
+        max_batch=app.config["WRITER_MAX_BATCH"],
+        max_latency=app.config["WRITER_MAX_LATENCY_MS"] / 1000.0,
+        result_timeout=app.config["WRITER_RESULT_TIMEOUT"],
+    )
+    app.extensions["writer"] = writer
+    atexit.register(writer.close)
+
+    # In-memory per-user title/category index for typeahead
+    from .suggest import SuggestIndexCache
+    app.extensions["suggest"] = SuggestIndexCache(
+        max_users=app.config["SUGGEST_MAX_USERS"],
+        idle_seconds=app.config["SUGGEST_IDLE_SECONDS"],
+    )
+
+    # In-memory per-user TF-IDF vectors for the related-notes panel
+    from .related import RelatedNotesCache
+    app.extensions["related"] = RelatedNotesCache(
+        max_users=app.config["RELATED_MAX_USERS"],
+        idle_seconds=app.config["RELATED_IDLE_SECONDS"],
+    )
+
     # Initialize Flask-Login
     login_manager.init_app(app)
 
+    # Token-bucket admission control for expensive endpoints
+    from .ratelimit import RateLimiter, MemoryBackend, enforce_rate_limit
+    app.extensions["ratelimit"] = RateLimiter(
+        backend=app.config["RATE_LIMIT_BACKEND"] or MemoryBackend(),
+        rate=app.config["RATE_LIMIT_RATE"],
+        burst=app.config["RATE_LIMIT_BURST"],
+        costs=app.config["RATE_LIMIT_COSTS"],
+    )
+    app.before_request(enforce_rate_limit)
+
+    # Optional periodic online backups (BACKUP_INTERVAL_SECONDS > 0, started on first request)
+    from .backup import start_backup_scheduler
+    start_backup_scheduler(app)
+
+    # Background jobs for heavy per-user work (started on first request)
+    from .jobs import JobRunner
+    runner = JobRunner(
+        app,
+        max_workers=app.config["JOBS_MAX_WORKERS"],
+        per_user=app.config["JOBS_PER_USER"],
+    )
+    app.extensions["jobs"] = runner
+    app.before_request(runner.ensure_started)
+
+    # gzip/brotli for dynamic responses; precompressed variants for /static
+    from .compression import compress_response, serve_precompressed_static
+    app.before_request(serve_precompressed_static)
+    app.after_request(compress_response)
+
+    # Fingerprinted bundles (app.py build-assets) with immutable caching
+    from .assets import AssetManifest, asset_urls, add_static_cache
+    app.extensions["assets"] = AssetManifest(app.static_folder)
+    app.jinja_env.globals["asset_urls"] = asset_urls
+
+    from .streaming import stream_flush
+    app.jinja_env.globals["stream_flush"] = stream_flush
+    app.after_request(add_static_cache)
+
+    # Sanitized Markdown for note display, cached by content hash
+    from .rendering import RenderCache, render_note
+    app.extensions["markdown"] = RenderCache(app.config["MARKDOWN_CACHE_SIZE"])
+    app.jinja_env.globals["render_note"] = render_note
+
+    # Content-addressed attachment files under instance/
+    from .attachments import AttachmentStore
+    app.extensions["attachments"] = AttachmentStore(app.config["ATTACHMENTS_DIR"])
+
+    # On-demand sampling profiler; requests only tag their thread's endpoint
+    from .profiler import SamplingProfiler
+    profiler = SamplingProfiler(interval=app.config["PROFILE_INTERVAL"])
+    app.extensions["profiler"] = profiler
+    app.before_request(profiler.tag)
+    app.teardown_request(profiler.untag)
+
     # Avoid circular imports
     from .models import get_user_by_id
     from .auth import auth_bp
     from .notes import notes_bp
     from .main import main_bp
     from .categories import categories_bp
+    from .jobs import jobs_bp
+    from .profiler import debug_bp
 
     # User loader for LoginManager
     @login_manager.user_loader
@@ -97,6 +229,8 @@ def create_app(test_config=None):
     app.register_blueprint(notes_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(categories_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(debug_bp)
 
     # -----------------------------------------------
     # ROOT ROUTE (Homepage: guest mode or dashboard)
@@ -114,12 +248,21 @@ def create_app(test_config=None):
         init_db()
         click.echo("Initialized the database.")
 
+    @app.cli.command("prune-history")
+    def prune_history_command():
+        from .revisions import prune_revisions
+        deleted = prune_revisions(
+            app.config["REVISION_KEEP_DAYS"], app.config["REVISION_KEEP_MIN"]
+        )
+        click.echo(f"Pruned {deleted} note revisions.")
+
     return app
 
 
 __all__ = [
     "create_app",
     "get_db",
+    "get_writer",
     "init_db",
     "login_manager",
 ]
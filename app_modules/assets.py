@@ -0,0 +1,178 @@
+# app_modules/assets.py
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from flask import current_app, request, url_for
+
+
+# Logical bundle name -> source files (relative to /static), in load order
+BUNDLES = {
+    "core.js": ["js/main.js", "js/categories_note_editor.js"],
+    "guest.js": ["js/autosave.js"],
+    "categories.js": ["js/categories.js"],
+    "sync.js": ["js/sync.js"],
+    "app.css": ["css/style.css"],
+}
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+# ============================================================
+# MINIFICATION (conservative: never rewrites tokens)
+# ============================================================
+
+def minify_js(source):
+    """Drop comment-only lines, indentation and blank lines."""
+    lines = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines)
+
+
+def minify_css(source):
+    """Drop comments and collapse whitespace around CSS punctuation."""
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,])\s*", r"\1", source)
+    source = re.sub(r":\s+", ":", source)
+    return source.replace(";}", "}").strip()
+
+
+def _bundle(name, static_folder):
+    parts = []
+    for rel in BUNDLES[name]:
+        with open(os.path.join(static_folder, rel), encoding="utf-8") as fh:
+            source = fh.read()
+
+        if name.endswith(".js"):
+            # Each file keeps its own scope, like separate <script> tags
+            parts.append(f";(function () {{\n{minify_js(source)}\n}})();")
+        else:
+            parts.append(minify_css(source))
+
+    return "\n".join(parts)
+
+
+# ============================================================
+# BUILD STEP
+# ============================================================
+
+def build_assets(static_folder, log=print):
+    """
+    Bundle and minify every entry in BUNDLES into content-hashed files
+    under static/dist and write the manifest. Returns the manifest.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+
+    manifest = {}
+    for name in BUNDLES:
+        data = _bundle(name, static_folder).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{digest}{ext}"
+
+        with open(os.path.join(dist, filename), "wb") as fh:
+            fh.write(data)
+
+        manifest[name] = f"{DIST_DIR}/{filename}"
+        log(f"{name} -> {manifest[name]} ({len(data)} bytes)")
+
+    # Remove bundles from previous builds
+    current = {os.path.basename(path) for path in manifest.values()}
+    for filename in os.listdir(dist):
+        base = filename
+        for suffix in (".gz", ".br"):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if filename != MANIFEST_NAME and base not in current:
+            os.remove(os.path.join(dist, filename))
+
+    with open(os.path.join(dist, MANIFEST_NAME), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+
+    return manifest
+
+
+# ============================================================
+# RUNTIME: MANIFEST LOOKUP + CACHE HEADERS
+# ============================================================
+
+class AssetManifest:
+    """Loads static/dist/manifest.json, reloading it when the file changes."""
+
+    def __init__(self, static_folder):
+        self.path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+        self._mtime = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+        if mtime != self._mtime:
+            with self._lock:
+                with open(self.path, encoding="utf-8") as fh:
+                    self._entries = json.load(fh)
+                self._mtime = mtime
+
+        return self._entries.get(name)
+
+
+def asset_urls(name):
+    """
+    Jinja helper: URLs to include for a logical bundle name.
+    One fingerprinted URL after `app.py build-assets`, otherwise the
+    individual source files so development works without a build.
+    """
+    built = current_app.extensions["assets"].get(name)
+    if built:
+        return [url_for("static", filename=built)]
+    return [url_for("static", filename=rel) for rel in BUNDLES[name]]
+
+
+def add_static_cache(response):
+    """
+    after_request hook: Cache-Control for /static only. Fingerprinted
+    files never change and are cached for a year, everything else for
+    STATIC_MAX_AGE. Other send_file responses (note downloads,
+    attachments) keep Flask's uncached default.
+    """
+    if request.endpoint != "static" or response.status_code not in (200, 206, 304):
+        return response
+
+    filename = (request.view_args or {}).get("filename", "")
+    if filename.startswith(DIST_DIR + "/") and not filename.endswith(MANIFEST_NAME):
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        return response
+
+    max_age = current_app.config["STATIC_MAX_AGE"]
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.expires = int(time.time() + max_age)
+    return response
+
+
+__all__ = [
+    "BUNDLES",
+    "minify_js",
+    "minify_css",
+    "build_assets",
+    "AssetManifest",
+    "asset_urls",
+    "add_static_cache",
+]
@@ -0,0 +1,215 @@
+# app_modules/attachments.py
+
+import os
+import hashlib
+import tempfile
+
+from flask import current_app
+
+from . import get_db, get_writer
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Served inline; anything else (text/html, image/svg+xml, ...) would run
+# as script on our origin, so it is always sent as a download
+INLINE_MIMETYPES = frozenset({"image/png", "image/jpeg", "image/gif", "image/webp"})
+
+
+# ============================================================
+# CONTENT-ADDRESSED FILE STORE
+# ============================================================
+
+class AttachmentStore:
+    """
+    Files stored once per SHA-256 under `root/ab/cd/<hash>`.
+    Uploads are streamed to a temp file in the same directory tree while
+    hashing, then moved into place by the writer once the link row has
+    committed (see add_attachment).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def spool(self, stream, max_size=None):
+        """
+        Copy `stream` to a temp file in chunks.
+        Returns (digest, size, temp_path). Raises ValueError if too large.
+        """
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise ValueError("Attachment too large.")
+                    sha.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        return sha.hexdigest(), size, tmp_path
+
+    def commit(self, digest, tmp_path):
+        """Move a spooled file into place, or drop it if already stored."""
+        target = self.path(digest)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+
+    def remove(self, digest):
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+
+def get_attachment_store():
+    """Return the app-wide AttachmentStore."""
+    return current_app.extensions["attachments"]
+
+
+# ============================================================
+# WRITES (file moves/unlinks run inside the writer so they are
+# serialized with the link rows that reference them)
+# ============================================================
+
+def add_attachment(note_id, user_id, stream, filename, mimetype):
+    """Store an uploaded file and link it to a note. Returns the link id."""
+    store = get_attachment_store()
+    digest, size, tmp_path = store.spool(
+        stream, current_app.config["ATTACHMENT_MAX_SIZE"]
+    )
+
+    def op(db):
+        cur = db.execute(
+            """
+            INSERT INTO note_attachments (note_id, user_id, hash, filename, mimetype, size, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            (note_id, user_id, digest, filename, mimetype, size),
+        )
+        return cur.lastrowid
+
+    writer = get_writer()
+    try:
+        attachment_id = writer.execute(op)
+        writer.execute(place_file, store, digest, tmp_path)
+        return attachment_id
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def place_file(db, store, digest, tmp_path):
+    """
+    Writer op: move an uploaded file into place. Submit it as its own op
+    after the insert of its link row has committed (see add_attachment):
+    if that commit failed, the file would be left with no link. A delete
+    that already dropped every link to it wins; the file is not placed.
+    """
+    still_used = db.execute(
+        "SELECT 1 FROM note_attachments WHERE hash = ? LIMIT 1",
+        (digest,),
+    ).fetchone()
+    if still_used:
+        store.commit(digest, tmp_path)
+
+
+def remove_unreferenced(db, store, digests):
+    """
+    Writer op: unlink stored files no longer referenced by any note.
+    Submit it as its own op after the delete that dropped the links has
+    committed (see release_files), never inside that delete: if its
+    commit failed, the links would come back without their files.
+    """
+    for digest in set(digests):
+        still_used = db.execute(
+            "SELECT 1 FROM note_attachments WHERE hash = ? LIMIT 1",
+            (digest,),
+        ).fetchone()
+        if not still_used:
+            store.remove(digest)
+
+
+def release_files(digests):
+    """After a committed delete, unlink the files it left unreferenced."""
+    if digests:
+        get_writer().execute(remove_unreferenced, get_attachment_store(), digests)
+
+
+def delete_attachment(attachment_id, user_id):
+    """Unlink an attachment from its note. Returns False if not found."""
+    def op(db):
+        row = db.execute(
+            "SELECT hash FROM note_attachments WHERE id = ? AND user_id = ?",
+            (attachment_id, user_id),
+        ).fetchone()
+        if row is None:
+            return None
+
+        db.execute("DELETE FROM note_attachments WHERE id = ?", (attachment_id,))
+        return row["hash"]
+
+    digest = get_writer().execute(op)
+    if digest is None:
+        return False
+
+    release_files([digest])
+    return True
+
+
+# ============================================================
+# READS
+# ============================================================
+
+def get_attachment(attachment_id, user_id):
+    db = get_db()
+    return db.execute(
+        """
+        SELECT id, note_id, hash, filename, mimetype, size, created_at
+        FROM note_attachments
+        WHERE id = ? AND user_id = ?
+        """,
+        (attachment_id, user_id),
+    ).fetchone()
+
+
+def get_note_attachments(note_id, user_id):
+    db = get_db()
+    return db.execute(
+        """
+        SELECT id, filename, mimetype, size, created_at
+        FROM note_attachments
+        WHERE note_id = ? AND user_id = ?
+        ORDER BY id ASC
+        """,
+        (note_id, user_id),
+    ).fetchall()
+
+
+__all__ = [
+    "AttachmentStore",
+    "get_attachment_store",
+    "INLINE_MIMETYPES",
+    "add_attachment",
+    "place_file",
+    "remove_unreferenced",
+    "release_files",
+    "delete_attachment",
+    "get_attachment",
+    "get_note_attachments",
+]
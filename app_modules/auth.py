@@ -4,8 +4,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from . import get_db
-from .models import User, get_user_by_username
+from .models import User, get_user_by_username, create_user
 
 auth_bp = Blueprint("auth", __name__, template_folder="../template", url_prefix="/auth")
 
@@ -30,7 +29,6 @@ def register():
             return render_template("register.html")
 
         # Check if user already exists
-        db = get_db()
         existing = get_user_by_username(username)
 
         if existing:
@@ -39,11 +37,7 @@ def register():
 
         # Create user
         hashed = generate_password_hash(password)
-        db.execute(
-            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (username, hashed),
-        )
-        db.commit()
+        create_user(username, hashed)
 
         flash("Registration successful. Please log in.")
         return redirect(url_for("auth.login"))
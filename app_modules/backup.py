@@ -0,0 +1,145 @@
+# app_modules/backup.py
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+
+BACKUP_PREFIX = "notes-"
+BACKUP_SUFFIX = ".db"
+
+# Exactly the names backup_database() writes: notes-<date>-<time>-<usec>-<pid>.db
+SNAPSHOT_RE = re.compile(
+    re.escape(BACKUP_PREFIX) + r"\d{8}-\d{6}-\d{6}-\d+" + re.escape(BACKUP_SUFFIX) + "$"
+)
+
+
+# ============================================================
+# ONLINE BACKUP
+# ============================================================
+
+def backup_database(src_path, dest, pages=64, pause=0.01, keep=7):
+    """
+    Copy a live SQLite database using the online backup API.
+
+    The copy advances `pages` pages at a time and sleeps `pause` seconds
+    between steps, so writers only ever wait for one small step. The
+    result is checked with PRAGMA integrity_check before it replaces
+    anything.
+
+    `dest` is a directory if it exists as one or ends with a path
+    separator (created if missing); it receives a timestamped snapshot,
+    keeping only the newest `keep`. Anything else is the file path to
+    write. Returns the path of the new backup.
+    """
+    if os.path.isdir(dest) or dest.endswith(("/", os.sep)):
+        os.makedirs(dest, exist_ok=True)
+        # Microseconds + pid: concurrent backups never share a name or .part file
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        target = os.path.join(dest, f"{BACKUP_PREFIX}{stamp}-{os.getpid()}{BACKUP_SUFFIX}")
+        rotate = True
+    else:
+        parent = os.path.dirname(os.path.abspath(dest))
+        os.makedirs(parent, exist_ok=True)
+        target = dest
+        rotate = False
+
+    tmp_path = target + ".part"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    def progress(status, remaining, total):
+        # Give writers a window between steps
+        if remaining:
+            time.sleep(pause)
+
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        src.backup(dst, pages=pages, progress=progress)
+        result = dst.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+    if result != "ok":
+        os.remove(tmp_path)
+        raise RuntimeError(f"Backup failed integrity check: {result}")
+
+    os.replace(tmp_path, target)
+
+    if rotate:
+        rotate_backups(os.path.dirname(target), keep)
+
+    return target
+
+
+def rotate_backups(directory, keep):
+    """
+    Delete all but the newest `keep` snapshots in `directory`. Only
+    names written by backup_database() are considered; other files are
+    never touched.
+    """
+    snapshots = sorted(  # timestamped names sort by age
+        name for name in os.listdir(directory) if SNAPSHOT_RE.match(name)
+    )
+
+    for name in snapshots[:-keep] if keep > 0 else snapshots:
+        os.remove(os.path.join(directory, name))
+
+
+# ============================================================
+# SCHEDULED BACKUPS
+# ============================================================
+
+def start_backup_scheduler(app):
+    """
+    Run backup_database() every BACKUP_INTERVAL_SECONDS in a daemon
+    thread. Does nothing when the interval is 0.
+
+    The thread starts on the first request, so only processes that
+    actually serve traffic back up; CLI commands and the debug
+    reloader's parent process build the app but never start it.
+    """
+    interval = app.config["BACKUP_INTERVAL_SECONDS"]
+    if not interval:
+        return None
+
+    started = threading.Event()
+    lock = threading.Lock()
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                path = backup_database(
+                    app.config["DATABASE"],
+                    os.path.join(app.config["BACKUP_DIR"], ""),  # always a directory
+                    pages=app.config["BACKUP_PAGES_PER_STEP"],
+                    pause=app.config["BACKUP_STEP_PAUSE"],
+                    keep=app.config["BACKUP_KEEP"],
+                )
+                app.logger.info("Scheduled backup written to %s", path)
+            except Exception:
+                app.logger.exception("Scheduled backup failed")
+
+    def ensure_started():
+        if started.is_set():
+            return
+        with lock:
+            if not started.is_set():
+                threading.Thread(target=loop, name="sqlite-backup", daemon=True).start()
+                started.set()
+
+    app.before_request(ensure_started)
+    return ensure_started
+
+
+__all__ = [
+    "backup_database",
+    "rotate_backups",
+    "start_backup_scheduler",
+]
@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_login import current_user, login_required
-from app_modules import get_db
-from app_modules.models import create_category, get_categories
+from app_modules.models import (
+    create_category,
+    rename_category,
+    delete_category,
+    get_categories_json,
+)
 
 # All API endpoints live under `/category-api/*`
 categories_bp = Blueprint("category_api", __name__, url_prefix="/category-api")
@@ -13,8 +17,9 @@ categories_bp = Blueprint("category_api", __name__, url_prefix="/category-api")
 @categories_bp.get("/list")
 @login_required
 def api_get_categories():
-    rows = get_categories(current_user.id)
-    return jsonify([dict(row) for row in rows])
+    return current_app.response_class(
+        get_categories_json(current_user.id), mimetype="application/json"
+    )
 
 
 # ============================================================
@@ -45,14 +50,8 @@ def api_rename_category(cat_id):
     if not new_name:
         return jsonify({"error": "Name required"}), 400
 
-    db = get_db()
-
     # Update ONLY the user's own category
-    db.execute(
-        "UPDATE categories SET name = ? WHERE id = ? AND user_id = ?",
-        (new_name, cat_id, current_user.id),
-    )
-    db.commit()
+    rename_category(cat_id, current_user.id, new_name)
 
     return jsonify({"status": "success"})
 
@@ -63,11 +62,6 @@ def api_rename_category(cat_id):
 @categories_bp.delete("/delete/<int:cat_id>")
 @login_required
 def api_delete_category(cat_id):
-    db = get_db()
-    db.execute(
-        "DELETE FROM categories WHERE id = ? AND user_id = ?",
-        (cat_id, current_user.id),
-    )
-    db.commit()
+    delete_category(cat_id, current_user.id)
 
     return jsonify({"status": "success"})
@@ -0,0 +1,210 @@
+# app_modules/compression.py
+
+import os
+import gzip
+import zlib
+import mimetypes
+
+from flask import current_app, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+STATIC_EXTENSIONS = (".css", ".js", ".html", ".svg", ".json", ".txt", ".map")
+
+
+# ============================================================
+# CONTENT NEGOTIATION
+# ============================================================
+
+def _accepted_encodings():
+    """Return the encodings the client accepts that we can produce, best first."""
+    header = request.headers.get("Accept-Encoding", "").lower()
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip())
+
+    encodings = []
+    if brotli is not None and "br" in accepted:
+        encodings.append("br")
+    if "gzip" in accepted:
+        encodings.append("gzip")
+    return encodings
+
+
+def _is_compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(response):
+    vary = response.headers.get("Vary", "")
+    if "accept-encoding" not in vary.lower():
+        response.headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+# ============================================================
+# DYNAMIC RESPONSE COMPRESSION (after_request)
+# ============================================================
+
+def _compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level)
+
+
+def _stream_compressed(chunks, encoding, level):
+    """Compress a streamed body chunk by chunk, flushing after each one."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=min(level, 11))
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def compress_response(response):
+    """after_request hook: gzip/brotli-encode text responses above a size threshold."""
+    config = current_app.config
+    if not config["COMPRESS_ENABLED"]:
+        return response
+
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough  # files: served precompressed instead
+        or "Content-Encoding" in response.headers
+        or not _is_compressible(response.mimetype)
+    ):
+        return response
+
+    encodings = _accepted_encodings()
+    if not encodings:
+        _add_vary(response)
+        return response
+
+    encoding = encodings[0]
+    level = config["COMPRESS_LEVEL"]
+
+    if response.is_streamed:
+        response.response = _stream_compressed(response.response, encoding, level)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config["COMPRESS_MIN_SIZE"]:
+            _add_vary(response)
+            return response
+        response.set_data(_compress(data, encoding, level))
+
+    response.headers["Content-Encoding"] = encoding
+    _add_vary(response)
+    return response
+
+
+# ============================================================
+# PRECOMPRESSED STATIC FILES (before_request)
+# ============================================================
+
+def serve_precompressed_static():
+    """
+    before_request hook: for /static requests, send `<file>.br` or
+    `<file>.gz` directly when it exists and is at least as new as the
+    original. Returns None to fall through to Flask's static handler.
+    """
+    if request.endpoint != "static" or not current_app.config["COMPRESS_ENABLED"]:
+        return None
+
+    filename = (request.view_args or {}).get("filename")
+    source = safe_join(current_app.static_folder, filename) if filename else None
+    if not source or not os.path.isfile(source):
+        return None
+
+    extensions = {"br": ".br", "gzip": ".gz"}
+    for encoding in _accepted_encodings():
+        candidate = source + extensions[encoding]
+        if os.path.isfile(candidate) and os.path.getmtime(candidate) >= os.path.getmtime(source):
+            mimetype = mimetypes.guess_type(source)[0] or "application/octet-stream"
+            response = send_file(
+                candidate,
+                mimetype=mimetype,
+                max_age=current_app.config["STATIC_MAX_AGE"],
+                conditional=True,
+                etag=True,
+            )
+            response.headers["Content-Encoding"] = encoding
+            _add_vary(response)
+            return response
+
+    return None
+
+
+# ============================================================
+# BUILD STEP
+# ============================================================
+
+def precompress_static(static_folder, level=9, log=print):
+    """
+    Write `.gz` (and `.br` when brotli is installed) next to every text
+    asset under `static_folder`, keeping only variants that are smaller.
+    Returns the number of files written.
+    """
+    written = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+
+            path = os.path.join(root, name)
+            with open(path, "rb") as fh:
+                data = fh.read()
+
+            variants = [(".gz", gzip.compress(data, compresslevel=level, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", brotli.compress(data, quality=11)))
+
+            for suffix, payload in variants:
+                target = path + suffix
+                if len(payload) >= len(data):
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                with open(target, "wb") as fh:
+                    fh.write(payload)
+                written += 1
+                log(f"{os.path.relpath(target, static_folder)}: {len(data)} -> {len(payload)} bytes")
+
+    return written
+
+
+__all__ = [
+    "compress_response",
+    "serve_precompressed_static",
+    "precompress_static",
+]
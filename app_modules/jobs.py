@@ -0,0 +1,369 @@
+# app_modules/jobs.py
+
+import json
+import time
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, jsonify
+from flask_login import current_user, login_required
+
+from . import get_db, get_writer
+
+
+# ============================================================
+# HANDLER REGISTRY
+# ============================================================
+
+# kind -> fn(ctx, user_id, params) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    """Register a function as the handler for jobs of `kind`."""
+    def decorator(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+class JobContext:
+    """Passed to handlers for progress reporting and cancellation checks."""
+
+    def __init__(self, job_id, progress_interval=0.5):
+        self.job_id = job_id
+        self.progress_interval = progress_interval
+        self._cancel = threading.Event()
+        self._last_report = 0.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction, message=None):
+        """Record progress (0..1). Writes are throttled to `progress_interval`."""
+        now = time.monotonic()
+        if fraction < 1 and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+
+        job_id = self.job_id
+
+        def op(db):
+            db.execute(
+                "UPDATE jobs SET progress = ?, message = ? WHERE id = ?",
+                (max(0.0, min(1.0, fraction)), message, job_id),
+            )
+
+        get_writer().execute(op)
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+class JobRunner:
+    """
+    In-process job runner backed by the `jobs` table.
+
+    Jobs are persisted before they run, so on startup any job left
+    `running` by a previous process is re-queued. A thread pool runs at
+    most `max_workers` jobs at once and at most `per_user` per user.
+    Assumes a single app process owns the jobs table.
+    """
+
+    def __init__(self, app, max_workers=2, per_user=1):
+        self.app = app
+        self.max_workers = max_workers
+        self.per_user = per_user
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._running = Counter()  # user_id -> running jobs
+        self._active = {}          # job_id -> JobContext
+        self._started = False
+
+    def ensure_started(self):
+        """Recover interrupted jobs and start dispatching (idempotent)."""
+        if self._started:
+            return
+
+        with self._lock:
+            if self._started:
+                return
+
+            def op(db):
+                db.execute(
+                    """
+                    UPDATE jobs
+                    SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'queued' END,
+                        params = CASE WHEN cancel_requested THEN NULL ELSE params END,
+                        started_at = NULL
+                    WHERE status = 'running'
+                    """
+                )
+
+            try:
+                with self.app.app_context():
+                    get_writer().execute(op)
+            except sqlite3.OperationalError:
+                # jobs table missing (init-db not run yet); retry on next call
+                self.app.logger.warning("Job runner not started: jobs table unavailable")
+                return
+
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="job"
+            )
+            self._started = True
+
+        self.dispatch()
+
+    # -----------------------------------------------------------
+    # PUBLIC API
+    # -----------------------------------------------------------
+
+    def enqueue(self, user_id, kind, params=None):
+        """Persist a new job and return its id."""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        payload = json.dumps(params or {})
+
+        def op(db):
+            cur = db.execute(
+                """
+                INSERT INTO jobs (user_id, kind, status, progress, params, created_at)
+                VALUES (?, ?, 'queued', 0, ?, CURRENT_TIMESTAMP)
+                """,
+                (user_id, kind, payload),
+            )
+            return cur.lastrowid
+
+        job_id = get_writer().execute(op)
+        self.ensure_started()
+        self.dispatch()
+        return job_id
+
+    def cancel(self, job_id, user_id):
+        """Cancel a queued or running job. Returns False if not found/finished."""
+        def op(db):
+            cur = db.execute(
+                """
+                UPDATE jobs
+                SET status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                    finished_at = CASE WHEN status = 'queued' THEN CURRENT_TIMESTAMP ELSE finished_at END,
+                    params = CASE WHEN status = 'queued' THEN NULL ELSE params END,
+                    cancel_requested = 1
+                WHERE id = ? AND user_id = ? AND status IN ('queued', 'running')
+                """,
+                (job_id, user_id),
+            )
+            return cur.rowcount > 0
+
+        found = get_writer().execute(op)
+
+        with self._lock:
+            ctx = self._active.get(job_id)
+        if ctx is not None:
+            ctx.cancel()
+        return found
+
+    # -----------------------------------------------------------
+    # DISPATCH
+    # -----------------------------------------------------------
+
+    def dispatch(self):
+        """Start queued jobs while worker and per-user slots are free."""
+        with self.app.app_context():
+            while True:
+                with self._lock:
+                    job = self._reserve()
+                if job is None:
+                    return
+
+                # Claiming waits on the writer, so it happens outside the
+                # lock; the reservation holds the job's slots meanwhile.
+                try:
+                    claimed = self._claim(job["id"])
+                except BaseException:
+                    self._release(job["id"], job["user_id"])
+                    raise
+
+                if not claimed:
+                    self._release(job["id"], job["user_id"])  # Cancelled in the meantime
+                    continue
+
+                self._pool.submit(
+                    self._run, self._active[job["id"]], job["user_id"], job["kind"], job["params"]
+                )
+
+    def _reserve(self):
+        """
+        Pick the next queued job that fits the free slots and reserve
+        them. Called with `_lock` held; returns the job row or None.
+        """
+        if not self._started or len(self._active) >= self.max_workers:
+            return None
+
+        queued = get_db().execute(
+            "SELECT id, user_id, kind, params FROM jobs WHERE status = 'queued' ORDER BY id ASC"
+        ).fetchall()
+
+        for job in queued:
+            if job["id"] in self._active:
+                continue
+
+            user_key = str(job["user_id"])
+            if self._running[user_key] >= self.per_user:
+                continue
+
+            self._active[job["id"]] = JobContext(job["id"])
+            self._running[user_key] += 1
+            return job
+
+        return None
+
+    def _release(self, job_id, user_id):
+        with self._lock:
+            self._active.pop(job_id, None)
+            self._running[str(user_id)] -= 1
+
+    def _claim(self, job_id):
+        def op(db):
+            cur = db.execute(
+                """
+                UPDATE jobs SET status = 'running', started_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'queued'
+                """,
+                (job_id,),
+            )
+            return cur.rowcount > 0
+
+        return get_writer().execute(op)
+
+    def _run(self, ctx, user_id, kind, params):
+        with self.app.app_context():
+            status, result, error = "done", None, None
+            try:
+                handler = JOB_HANDLERS[kind]
+                result = handler(ctx, user_id, json.loads(params or "{}"))
+            except JobCancelled:
+                status = "cancelled"
+            except Exception as exc:
+                self.app.logger.exception("Job %s failed", ctx.job_id)
+                status, error = "failed", str(exc)
+
+            self._finish(ctx.job_id, status, result, error)
+
+        self._release(ctx.job_id, user_id)
+        self.dispatch()
+
+    def _finish(self, job_id, status, result, error):
+        # params can hold a whole sync payload; it is not needed once finished
+        payload = json.dumps(result) if result is not None else None
+
+        def op(db):
+            db.execute(
+                """
+                UPDATE jobs
+                SET status = ?, result = ?, error = ?, params = NULL,
+                    progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END,
+                    finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                (status, payload, error, status, job_id),
+            )
+
+        get_writer().execute(op)
+
+
+def get_job_runner():
+    """Return the app-wide JobRunner."""
+    return current_app.extensions["jobs"]
+
+
+def get_job(job_id, user_id):
+    """Return a job owned by the user, or None."""
+    db = get_db()
+    return db.execute(
+        """
+        SELECT id, kind, status, progress, message, result, error,
+               created_at, started_at, finished_at
+        FROM jobs
+        WHERE id = ? AND user_id = ?
+        """,
+        (job_id, user_id),
+    ).fetchone()
+
+
+# ============================================================
+# BUILT-IN HANDLERS
+# ============================================================
+
+@job_handler("sync")
+def sync_job(ctx, user_id, params):
+    """Sync a large batch of local notes in chunks, reporting progress."""
+    from .sync import sync_local_to_cloud
+
+    notes = params.get("notes", [])
+    chunk = current_app.config["SYNC_CHUNK_SIZE"]
+
+    for start in range(0, len(notes), chunk):
+        ctx.check_cancelled()
+        sync_local_to_cloud(user_id, notes[start:start + chunk])
+        ctx.progress((start + chunk) / len(notes), f"Synced {min(start + chunk, len(notes))} notes")
+
+    return {"synced": len(notes)}
+
+
+# ============================================================
+# STATUS API
+# ============================================================
+
+jobs_bp = Blueprint("jobs", __name__, url_prefix="/jobs")
+
+
+@jobs_bp.get("/<int:job_id>")
+@login_required
+def job_status(job_id):
+    job = get_job(job_id, current_user.id)
+    if not job:
+        return jsonify({"status": "error", "msg": "Job not found"}), 404
+
+    data = dict(job)
+    data["result"] = json.loads(job["result"]) if job["result"] else None
+    return jsonify(data)
+
+
+@jobs_bp.post("/<int:job_id>/cancel")
+@login_required
+def job_cancel(job_id):
+    if not get_job_runner().cancel(job_id, current_user.id):
+        return jsonify({"status": "error", "msg": "Job not found or already finished"}), 404
+
+    return jsonify({"status": "success"})
+
+
+__all__ = [
+    "JOB_HANDLERS",
+    "job_handler",
+    "JobCancelled",
+    "JobContext",
+    "JobRunner",
+    "get_job_runner",
+    "get_job",
+    "jobs_bp",
+]
@@ -0,0 +1,399 @@
+# app_modules/loadtest.py
+
+import os
+import re
+import json
+import time
+import uuid
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+# Default traffic mix (relative weights)
+DEFAULT_MIX = {
+    "dashboard": 40,
+    "search": 15,
+    "create": 15,
+    "edit": 15,
+    "pin": 10,
+    "sync": 5,
+}
+
+SEARCH_WORDS = ["meeting", "todo", "idea", "draft", "note", "list", "plan"]
+
+NOTE_ID_RE = re.compile(r'data-note-id="(\d+)"')
+
+# A successful login redirects here; a failed one re-renders the login page with 200
+DASHBOARD_PATH = "/notes/dashboard"
+
+
+# ============================================================
+# HTTP CLIENT (one cookie jar per synthetic user)
+# ============================================================
+
+class LoadClient:
+    def __init__(self, base_url, username, password):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.note_ids = []
+        self.lock = threading.Lock()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, method, path, form=None, json_body=None):
+        """Send a request and return (status, body)."""
+        status, body, _ = self._open(method, path, form, json_body)
+        return status, body
+
+    def login(self):
+        """
+        Log in and return (ok, status, body). Redirects are followed, so
+        the status alone cannot tell a failed login (login page, 200)
+        from a successful one; only ending up on the dashboard counts.
+        """
+        status, body, url = self._open("POST", "/auth/login", form={
+            "username": self.username,
+            "password": self.password,
+        })
+        ok = status == 200 and urllib.parse.urlsplit(url).path == DASHBOARD_PATH
+        return ok, status, body
+
+    def _open(self, method, path, form=None, json_body=None):
+        """Send a request and return (status, body, final URL after redirects)."""
+        data = None
+        headers = {}
+        if form is not None:
+            data = urllib.parse.urlencode(form).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif json_body is not None:
+            data = json.dumps(json_body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        req = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers, method=method
+        )
+        try:
+            with self.opener.open(req, timeout=30) as resp:
+                return resp.status, resp.read().decode("utf-8", "replace"), resp.geturl()
+        except urllib.error.HTTPError as exc:
+            return exc.code, "", exc.geturl()
+
+    def remember_notes(self, body):
+        ids = NOTE_ID_RE.findall(body)
+        if ids:
+            with self.lock:
+                self.note_ids = sorted(set(int(i) for i in ids))
+
+    def random_note(self):
+        with self.lock:
+            return random.choice(self.note_ids) if self.note_ids else None
+
+
+# ============================================================
+# OPERATIONS
+# ============================================================
+
+def _text(words=20):
+    return " ".join(random.choice(SEARCH_WORDS) for _ in range(words))
+
+
+def op_dashboard(client):
+    status, body = client.request("GET", "/notes/dashboard")
+    client.remember_notes(body)
+    return status
+
+
+def op_search(client):
+    q = urllib.parse.quote(random.choice(SEARCH_WORDS))
+    status, _ = client.request("GET", f"/notes/dashboard?q={q}")
+    return status
+
+
+def op_create(client):
+    status, body = client.request("POST", "/notes/create", form={
+        "title": f"{random.choice(SEARCH_WORDS)} {uuid.uuid4().hex[:6]}",
+        "content": _text(),
+    })
+    client.remember_notes(body)
+    return status
+
+
+def op_edit(client):
+    note_id = client.random_note()
+    if note_id is None:
+        return op_create(client)
+
+    status, _ = client.request("POST", f"/notes/edit/{note_id}", form={
+        "title": f"edited {uuid.uuid4().hex[:6]}",
+        "content": _text(),
+    })
+    return status
+
+
+def op_pin(client):
+    note_id = client.random_note()
+    if note_id is None:
+        return op_create(client)
+
+    status, _ = client.request("POST", f"/notes/pin/{note_id}")
+    return status
+
+
+def op_sync(client):
+    now = datetime.now(timezone.utc).isoformat()
+    notes = [
+        {"title": f"local {uuid.uuid4().hex[:6]}", "content": _text(), "created_at": now}
+        for _ in range(5)
+    ]
+    status, _ = client.request("POST", "/notes/sync", json_body={"notes": notes})
+    return status
+
+
+OPERATIONS = {
+    "dashboard": op_dashboard,
+    "search": op_search,
+    "create": op_create,
+    "edit": op_edit,
+    "pin": op_pin,
+    "sync": op_sync,
+}
+
+
+# ============================================================
+# RESULTS
+# ============================================================
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def report(results, elapsed, writer_stats=None, log=print):
+    log("")
+    log(f"{'endpoint':<12} {'reqs':>8} {'rps':>8} {'err%':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+
+    total = 0
+    total_errors = 0
+    for name in sorted(results.latencies):
+        values = sorted(results.latencies[name])
+        errors = results.errors[name]
+        total += len(values)
+        total_errors += errors
+        log(
+            f"{name:<12} {len(values):>8} {len(values) / elapsed:>8.1f} "
+            f"{100.0 * errors / len(values):>6.1f}% "
+            f"{percentile(values, 50) * 1000:>9.1f} "
+            f"{percentile(values, 95) * 1000:>9.1f} "
+            f"{percentile(values, 99) * 1000:>9.1f}"
+        )
+
+    log("")
+    log(f"Total: {total} requests in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.1f} req/s), "
+        f"{total_errors} errors")
+
+    if writer_stats is not None:
+        log(
+            f"SQLite writer: {writer_stats.get('writes', 0)} writes in "
+            f"{writer_stats.get('batches', 0)} commits, "
+            f"{writer_stats.get('lock_waits', 0)} lock waits "
+            f"({writer_stats.get('lock_wait_ms', 0)} ms), "
+            f"{writer_stats.get('lock_errors', 0)} lock errors"
+        )
+
+
+# ============================================================
+# DRIVER
+# ============================================================
+
+def parse_mix(text):
+    """Parse 'dashboard=40,search=10' into a weight dict."""
+    if not text:
+        return dict(DEFAULT_MIX)
+
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def setup_users(base_url, count, threads):
+    """
+    Register and log in `count` synthetic users.
+    Returns (clients, dropped) where dropped counts failed logins by
+    reason: the HTTP status, or "login page" when the login form came
+    back instead of the dashboard (e.g. registration failed).
+    """
+    run_id = uuid.uuid4().hex[:8]
+
+    def make(i):
+        client = LoadClient(base_url, f"load_{run_id}_{i}", "load-password")
+        client.request("POST", "/auth/register", form={
+            "username": client.username,
+            "password": client.password,
+            "confirm_password": client.password,
+        })
+        ok, status, body = client.login()
+        client.remember_notes(body)
+        return client, ok, status
+
+    clients = []
+    dropped = defaultdict(int)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for client, ok, status in pool.map(make, range(count)):
+            if ok:
+                clients.append(client)
+            else:
+                dropped["login page" if status == 200 else str(status)] += 1
+
+    return clients, dict(dropped)
+
+
+def drive(clients, mix, threads, duration, results):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        own = clients[index::threads] or clients
+        i = 0
+        while time.monotonic() < deadline:
+            client = own[i % len(own)]
+            i += 1
+            name = random.choices(names, weights)[0]
+
+            started = time.perf_counter()
+            try:
+                status = OPERATIONS[name](client)
+                ok = 200 <= status < 400
+            except Exception:
+                ok = False
+            results.record(name, time.perf_counter() - started, ok)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+
+def start_local_server(database):
+    """Start the app on an ephemeral port backed by `database`."""
+    from werkzeug.serving import make_server
+    from app_modules import create_app, init_db
+
+    # One access-log line per request would bury the report
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    app = create_app(test_config={
+        "DATABASE": database,
+        "DEBUG": False,
+        "RATE_LIMIT_ENABLED": False,
+    })
+    with app.app_context():
+        init_db()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return app, server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="app.py loadtest")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default="", help="e.g. dashboard=40,search=15,create=15")
+    parser.add_argument("--url", default="", help="target a running server instead")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    app = server = None
+    tmp_dir = None
+
+    if args.url:
+        base_url = args.url
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="notes-loadtest-")
+        app, server = start_local_server(os.path.join(tmp_dir, "loadtest.db"))
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        print(f"Target: {base_url}")
+        print(f"Setting up {args.users} users...")
+        clients, dropped = setup_users(base_url, args.users, args.threads)
+        print(f"Logged in {len(clients)}/{args.users} users.")
+        if dropped:
+            statuses = ", ".join(f"{status}: {n}" for status, n in sorted(dropped.items()))
+            print(f"WARNING: {sum(dropped.values())} users could not log in ({statuses}).")
+            if "429" in dropped:
+                print(
+                    "WARNING: the target rate-limits auth.login; run it with "
+                    "RATE_LIMIT_ENABLED = False (or a larger RATE_LIMIT_BURST) for load tests."
+                )
+            if "login page" in dropped:
+                print(
+                    "WARNING: some logins returned the login page instead of the "
+                    "dashboard (registration or credentials rejected)."
+                )
+        if not clients:
+            print("No users could log in; aborting.")
+            return
+
+        print(f"Running {args.threads} threads for {args.duration:.0f}s, mix: {mix}")
+        results = Results()
+        started = time.monotonic()
+        drive(clients, mix, args.threads, args.duration, results)
+        elapsed = time.monotonic() - started
+
+        writer_stats = dict(app.extensions["writer"].stats) if app is not None else None
+        report(results, elapsed, writer_stats)
+    finally:
+        if server is not None:
+            server.shutdown()
+            app.extensions["writer"].close()
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+__all__ = [
+    "DEFAULT_MIX",
+    "LoadClient",
+    "Results",
+    "percentile",
+    "parse_mix",
+    "main",
+]
@@ -0,0 +1,181 @@
+# app_modules/maintenance.py
+
+import time
+import sqlite3
+
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+# ============================================================
+# CONNECTION
+# ============================================================
+
+def _connect(path, timeout):
+    # Autocommit: every statement below is its own short transaction
+    db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    db.row_factory = sqlite3.Row
+    return db
+
+
+def _pragma(db, name):
+    return db.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+# ============================================================
+# MAINTENANCE STEPS
+# ============================================================
+
+def is_incremental(db):
+    return _pragma(db, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+
+
+def convert_to_incremental_vacuum(db):
+    """
+    Switch an existing database to incremental auto-vacuum.
+    This needs one full VACUUM, which holds an exclusive lock for the
+    whole rebuild and temporarily needs about twice the disk space, so
+    it only runs on request (`app.py maintain --convert`).
+    Returns True if the conversion ran.
+    """
+    if is_incremental(db):
+        return False
+
+    db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    db.execute("VACUUM")
+    return True
+
+
+def reclaim_free_pages(db, pages_per_step=256, pause=0.05, max_steps=None):
+    """
+    Release free pages back to the filesystem `pages_per_step` at a time,
+    sleeping `pause` seconds between steps so writers are never blocked
+    for long. Returns the number of pages reclaimed.
+    """
+    reclaimed = 0
+    steps = 0
+
+    while True:
+        free = _pragma(db, "freelist_count")
+        if free == 0 or (max_steps is not None and steps >= max_steps):
+            break
+
+        # The pragma frees one page per sqlite3_step(), and execute() steps a
+        # statement without result columns only once; executescript() runs
+        # it to completion. (Connection is in autocommit, so nothing is
+        # committed implicitly.)
+        db.executescript(f"PRAGMA incremental_vacuum({int(pages_per_step)});")
+        step = free - _pragma(db, "freelist_count")
+        if step <= 0:
+            break  # Not in incremental mode (or blocked); nothing more to do
+        reclaimed += step
+        steps += 1
+        time.sleep(pause)
+
+    return reclaimed
+
+
+def refresh_statistics(db):
+    """Refresh query planner statistics."""
+    db.execute("ANALYZE")
+    db.execute("PRAGMA optimize")
+
+
+def space_stats(db):
+    """
+    Return per-table/per-index size and fragmentation from `dbstat`.
+    Fragmentation is the share of pages that do not directly follow
+    the previous page of the same b-tree on disk.
+    Returns an empty list when SQLite was built without dbstat.
+    """
+    try:
+        rows = db.execute(
+            "SELECT name, pageno, pgsize, unused FROM dbstat ORDER BY name, path"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+    stats = {}
+    previous = {}
+    for row in rows:
+        entry = stats.setdefault(row["name"], {
+            "name": row["name"],
+            "pages": 0,
+            "bytes": 0,
+            "unused": 0,
+            "out_of_order": 0,
+        })
+        entry["pages"] += 1
+        entry["bytes"] += row["pgsize"]
+        entry["unused"] += row["unused"]
+
+        last = previous.get(row["name"])
+        if last is not None and row["pageno"] != last + 1:
+            entry["out_of_order"] += 1
+        previous[row["name"]] = row["pageno"]
+
+    result = []
+    for entry in stats.values():
+        entry["fragmentation"] = entry["out_of_order"] / max(1, entry["pages"] - 1)
+        entry["fill"] = 1 - entry["unused"] / max(1, entry["bytes"])
+        result.append(entry)
+
+    return sorted(result, key=lambda e: e["bytes"], reverse=True)
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def run_maintenance(path, pages_per_step=256, pause=0.05, timeout=30.0, convert=False,
+                    log=print):
+    """
+    Run all maintenance steps against the database at `path`.
+    Safe while the app serves traffic unless `convert` is set.
+    """
+    db = _connect(path, timeout)
+    try:
+        page_size = _pragma(db, "page_size")
+        log(f"Database: {path}")
+        log(f"  pages: {_pragma(db, 'page_count')}  free: {_pragma(db, 'freelist_count')}  page size: {page_size}")
+
+        if convert and convert_to_incremental_vacuum(db):
+            log("Switched to incremental auto-vacuum (one-time VACUUM).")
+
+        if is_incremental(db):
+            reclaimed = reclaim_free_pages(db, pages_per_step, pause)
+            log(f"Reclaimed {reclaimed} free pages ({reclaimed * page_size // 1024} KiB).")
+        else:
+            log(
+                "Database is not in incremental auto-vacuum mode; free pages are not reclaimed. "
+                "Run `python app.py maintain --convert` once during a quiet period "
+                "(full VACUUM: exclusive lock, ~2x disk space)."
+            )
+
+        refresh_statistics(db)
+        log("Planner statistics refreshed (ANALYZE, PRAGMA optimize).")
+
+        stats = space_stats(db)
+        if not stats:
+            log("dbstat not available; skipping per-object stats.")
+            return
+
+        log("")
+        log(f"{'object':<40} {'pages':>8} {'KiB':>10} {'fill':>7} {'frag':>7}")
+        for entry in stats:
+            log(
+                f"{entry['name']:<40} {entry['pages']:>8} {entry['bytes'] // 1024:>10} "
+                f"{entry['fill']:>6.0%} {entry['fragmentation']:>6.0%}"
+            )
+    finally:
+        db.close()
+
+
+__all__ = [
+    "is_incremental",
+    "convert_to_incremental_vacuum",
+    "reclaim_free_pages",
+    "refresh_statistics",
+    "space_stats",
+    "run_maintenance",
+]
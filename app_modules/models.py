@@ -1,8 +1,17 @@
 # app_modules/models.py
 
+import json
+
+from flask import current_app
 from flask_login import UserMixin
 from datetime import datetime
-from . import get_db
+from . import get_db, get_writer
+from .suggest import get_suggest_index
+from .related import get_related_index
+from .revisions import record_revision
+from .attachments import release_files
+from .rendering import content_hash
+from .writer import enable_wal
 
 
 # ============================================================
@@ -43,89 +52,236 @@ def get_user_by_username(username):
 
 
 # ============================================================
-# NOTE MODEL / OPERATIONS
+# NOTE / CATEGORY RECORDS
 # ============================================================
 
-def create_note(user_id, title, content, category_id=None, pinned=False, reminder=None):
-    """Create a note for a user."""
-    db = get_db()
-    db.execute(
-        """
-        INSERT INTO notes (user_id, title, content, category_id, pinned, reminder, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        """,
-        (user_id, title, content, category_id, int(pinned), reminder),
+class Note:
+    """
+    A note as read for one use case. Each projection below selects a
+    prefix of these fields, in this order, so rows map straight onto
+    the constructor; fields outside the projection are None.
+    """
+    __slots__ = (
+        "id", "title", "content", "content_hash", "pinned", "reminder",
+        "category_id", "category_name", "created_at", "updated_at",
     )
-    db.commit()
 
+    def __init__(self, id, title=None, content=None, content_hash=None, pinned=None,
+                 reminder=None, category_id=None, category_name=None,
+                 created_at=None, updated_at=None):
+        self.id = id
+        self.title = title
+        self.content = content
+        self.content_hash = content_hash
+        self.pinned = pinned
+        self.reminder = reminder
+        self.category_id = category_id
+        self.category_name = category_name
+        self.created_at = created_at
+        self.updated_at = updated_at
 
-def get_notes_by_user(user_id):
-    """Return all notes for a specific user, pinned first."""
-    db = get_db()
-    rows = db.execute(
-        """
-        SELECT n.*, c.name AS category_name
+
+class Category:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+def _note_row(cursor, row):
+    return Note(*row)
+
+
+def _category_row(cursor, row):
+    return Category(*row)
+
+
+# Cards show at most 200 characters; one extra lets the template tell
+# whether to add "...", without reading the full content of every note.
+CARD_PREVIEW_CHARS = 200
+
+NOTE_CARD_COLUMNS = f"""
+    n.id, n.title, substr(n.content, 1, {CARD_PREVIEW_CHARS + 1}), n.content_hash,
+    n.pinned, n.reminder, n.category_id, c.name
+"""
+NOTE_EDITOR_COLUMNS = "id, title, content, content_hash, pinned, reminder, category_id"
+NOTE_EXPORT_COLUMNS = "id, title, content, content_hash"
+
+
+def _query(sql, params, row_factory):
+    """Run a read with a per-cursor row factory (None gives plain tuples)."""
+    cursor = get_db().cursor()
+    cursor.row_factory = row_factory
+    return cursor.execute(sql, params)
+
+
+# ============================================================
+# NOTE OPERATIONS
+# ============================================================
+
+def create_note(user_id, title, content, category_id=None, pinned=False, reminder=None):
+    """Create a note for a user and return its id."""
+    snapshot_every = current_app.config["REVISION_SNAPSHOT_INTERVAL"]
+
+    def op(db):
+        cur = db.execute(
+            """
+            INSERT INTO notes (user_id, title, content, content_hash, category_id, pinned, reminder, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            (user_id, title, content, content_hash(content), category_id, int(pinned), reminder),
+        )
+        record_revision(db, cur.lastrowid, user_id, title, content,
+                        snapshot_every=snapshot_every)
+        return cur.lastrowid
+
+    note_id = get_writer().execute(op)
+    get_suggest_index().add(user_id, "note", note_id, title)
+    get_related_index().note_saved(user_id, note_id, title, content)
+    return note_id
+
+
+def _notes_cursor(user_id, query=None):
+    """Cursor of card Notes for a user (optionally LIKE-filtered), pinned first."""
+    if not query:
+        return _query(
+            f"""
+            SELECT {NOTE_CARD_COLUMNS}
+            FROM notes n
+            LEFT JOIN categories c ON n.category_id = c.id
+            WHERE n.user_id = ?
+            ORDER BY n.pinned DESC, n.updated_at DESC
+            """,
+            (user_id,),
+            _note_row,
+        )
+
+    like = f"%{query}%"
+    return _query(
+        f"""
+        SELECT {NOTE_CARD_COLUMNS}
         FROM notes n
         LEFT JOIN categories c ON n.category_id = c.id
         WHERE n.user_id = ?
+        AND (n.title LIKE ? OR n.content LIKE ?)
         ORDER BY n.pinned DESC, n.updated_at DESC
         """,
-        (user_id,),
-    ).fetchall()
-    return rows
+        (user_id, like, like),
+        _note_row,
+    )
+
+
+def get_notes_by_user(user_id):
+    """Return all notes for a specific user, pinned first."""
+    return _notes_cursor(user_id).fetchall()
+
+
+def iter_notes(user_id, query=None, chunk_size=50):
+    """
+    Yield a user's notes (or search results) in fetchmany() chunks.
+    The query only runs when iteration starts, and at most one chunk of
+    rows is held in memory at a time. The cursor stays open for as long
+    as a streamed page is being read; in WAL mode (see enable_wal) that
+    does not block the writer's COMMIT.
+    """
+    cursor = _notes_cursor(user_id, query)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield from rows
 
 
 def get_note_by_id(note_id, user_id):
-    """Return a single note owned by the user."""
-    db = get_db()
-    return db.execute(
-        """
-        SELECT * FROM notes
+    """Return a single note owned by the user, with the fields the editor needs."""
+    return _query(
+        f"""
+        SELECT {NOTE_EDITOR_COLUMNS} FROM notes
         WHERE id = ? AND user_id = ?
         """,
         (note_id, user_id),
+        _note_row,
     ).fetchone()
 
 
-def update_note(note_id, user_id, title, content, category_id=None, pinned=False, reminder=None):
-    """Update a note."""
-    db = get_db()
-    db.execute(
-        """
-        UPDATE notes
-        SET title = ?, content = ?, category_id = ?, pinned = ?, reminder = ?, updated_at = CURRENT_TIMESTAMP
+def get_note_for_export(note_id, user_id):
+    """Return a note owned by the user with only its id, title and content."""
+    return _query(
+        f"""
+        SELECT {NOTE_EXPORT_COLUMNS} FROM notes
         WHERE id = ? AND user_id = ?
         """,
-        (title, content, category_id, int(pinned), reminder, note_id, user_id),
-    )
-    db.commit()
+        (note_id, user_id),
+        _note_row,
+    ).fetchone()
+
+
+def update_note(note_id, user_id, title, content, category_id=None, pinned=False, reminder=None):
+    """Update a note, recording a revision when title or content changed."""
+    snapshot_every = current_app.config["REVISION_SNAPSHOT_INTERVAL"]
+
+    def op(db):
+        old = db.execute(
+            "SELECT title, content FROM notes WHERE id = ? AND user_id = ?",
+            (note_id, user_id),
+        ).fetchone()
+        if old is None:
+            return
+
+        db.execute(
+            """
+            UPDATE notes
+            SET title = ?, content = ?, content_hash = ?, category_id = ?, pinned = ?, reminder = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND user_id = ?
+            """,
+            (title, content, content_hash(content), category_id, int(pinned), reminder,
+             note_id, user_id),
+        )
+
+        if (old["title"], old["content"]) != (title, content):
+            record_revision(db, note_id, user_id, title, content,
+                            previous=(old["title"], old["content"]),
+                            snapshot_every=snapshot_every)
+
+    get_writer().execute(op)
+    get_suggest_index().add(user_id, "note", note_id, title)
+    get_related_index().note_saved(user_id, note_id, title, content)
 
 
 def delete_note(note_id, user_id):
-    """Delete a note."""
-    db = get_db()
-    db.execute(
-        "DELETE FROM notes WHERE id = ? AND user_id = ?",
-        (note_id, user_id),
-    )
-    db.commit()
+    """Delete a note together with its history and attachment links."""
+    def op(db):
+        hashes = [
+            row["hash"] for row in db.execute(
+                "SELECT hash FROM note_attachments WHERE note_id = ? AND user_id = ?",
+                (note_id, user_id),
+            ).fetchall()
+        ]
+
+        db.execute(
+            "DELETE FROM notes WHERE id = ? AND user_id = ?",
+            (note_id, user_id),
+        )
+        db.execute(
+            "DELETE FROM note_revisions WHERE note_id = ? AND user_id = ?",
+            (note_id, user_id),
+        )
+        db.execute(
+            "DELETE FROM note_attachments WHERE note_id = ? AND user_id = ?",
+            (note_id, user_id),
+        )
+        return hashes
+
+    release_files(get_writer().execute(op))
+    get_suggest_index().remove(user_id, "note", note_id)
+    get_related_index().note_deleted(user_id, note_id)
 
 
 def search_notes(user_id, query):
     """Search user's notes by title or content."""
-    db = get_db()
-    like = f"%{query}%"
-    return db.execute(
-        """
-        SELECT n.*, c.name AS category_name
-        FROM notes n
-        LEFT JOIN categories c ON n.category_id = c.id
-        WHERE n.user_id = ?
-        AND (n.title LIKE ? OR n.content LIKE ?)
-        ORDER BY n.pinned DESC, n.updated_at DESC
-        """,
-        (user_id, like, like),
-    ).fetchall()
+    return _notes_cursor(user_id, query).fetchall()
 
 
 # ============================================================
@@ -133,34 +289,94 @@ def search_notes(user_id, query):
 # ============================================================
 
 def create_category(user_id, name):
-    db = get_db()
-    db.execute(
-        "INSERT INTO categories (user_id, name) VALUES (?, ?)",
-        (user_id, name),
-    )
-    db.commit()
+    def op(db):
+        cur = db.execute(
+            "INSERT INTO categories (user_id, name) VALUES (?, ?)",
+            (user_id, name),
+        )
+        return cur.lastrowid
+
+    cat_id = get_writer().execute(op)
+    get_suggest_index().add(user_id, "category", cat_id, name)
+    return cat_id
+
+
+def rename_category(cat_id, user_id, name):
+    """Rename a category owned by the user."""
+    def op(db):
+        db.execute(
+            "UPDATE categories SET name = ? WHERE id = ? AND user_id = ?",
+            (name, cat_id, user_id),
+        )
+
+    get_writer().execute(op)
+    get_suggest_index().add(user_id, "category", cat_id, name)
+
+
+def delete_category(cat_id, user_id):
+    """Delete a category owned by the user."""
+    def op(db):
+        db.execute(
+            "DELETE FROM categories WHERE id = ? AND user_id = ?",
+            (cat_id, user_id),
+        )
+
+    get_writer().execute(op)
+    get_suggest_index().remove(user_id, "category", cat_id)
 
 
 def get_categories(user_id):
+    return _query(
+        "SELECT id, name FROM categories WHERE user_id = ? ORDER BY name ASC",
+        (user_id,),
+        _category_row,
+    ).fetchall()
+
+
+def get_categories_json(user_id):
+    """
+    A user's categories as a JSON array of {"id", "name"}, encoded
+    straight from plain tuples (no Row or object per category).
+    """
+    rows = _query(
+        "SELECT id, name FROM categories WHERE user_id = ? ORDER BY name ASC",
+        (user_id,),
+        None,
+    ).fetchall()
+    return json.dumps([{"id": id_, "name": name} for id_, name in rows],
+                      separators=(",", ":"))
+
+
+def get_suggest_entries(user_id):
+    """Return (kind, id, text) rows used to build the typeahead index."""
+    db = get_db()
+    rows = db.execute(
+        """
+        SELECT 'note' AS kind, id, title AS text FROM notes WHERE user_id = ?
+        UNION ALL
+        SELECT 'category' AS kind, id, name AS text FROM categories WHERE user_id = ?
+        """,
+        (user_id, user_id),
+    ).fetchall()
+    return [(row["kind"], row["id"], row["text"]) for row in rows]
+
+
+def get_note_texts(user_id):
+    """Return (id, title, content) for all of a user's notes (related-notes index)."""
     db = get_db()
-    return db.execute(
-        "SELECT * FROM categories WHERE user_id = ? ORDER BY name ASC",
+    rows = db.execute(
+        "SELECT id, title, content FROM notes WHERE user_id = ?",
         (user_id,),
     ).fetchall()
+    return [(row["id"], row["title"], row["content"]) for row in rows]
 
 
 # ============================================================
 # SYNCING LOCAL NOTES → CLOUD (used in sync.py)
 # ============================================================
 
-def insert_synced_note(user_id, title, content, category, created_at):
-    """
-    Insert a note coming from localStorage during syncing.
-    Avoid duplicates by title+content+created_at.
-    """
-    db = get_db()
-
-    # Check for duplicates
+def _insert_synced_note(db, user_id, title, content, created_at, snapshot_every=20):
+    """Insert one synced note on the writer connection unless duplicate."""
     dup = db.execute(
         """
         SELECT id FROM notes
@@ -170,28 +386,106 @@ def insert_synced_note(user_id, title, content, category, created_at):
     ).fetchone()
 
     if dup:
-        return
+        return None
 
-    db.execute(
+    cur = db.execute(
         """
-        INSERT INTO notes (user_id, title, content, category_id, pinned, reminder, created_at, updated_at)
-        VALUES (?, ?, ?, NULL, 0, NULL, ?, CURRENT_TIMESTAMP)
+        INSERT INTO notes (user_id, title, content, content_hash, category_id, pinned, reminder, created_at, updated_at)
+        VALUES (?, ?, ?, ?, NULL, 0, NULL, ?, CURRENT_TIMESTAMP)
         """,
-        (user_id, title, content, created_at),
+        (user_id, title, content, content_hash(content), created_at),
     )
-    db.commit()
+    record_revision(db, cur.lastrowid, user_id, title, content,
+                    snapshot_every=snapshot_every)
+    return cur.lastrowid
+
+
+def insert_synced_note(user_id, title, content, category, created_at):
+    """
+    Insert a note coming from localStorage during syncing.
+    Avoid duplicates by title+content+created_at.
+    """
+    note_id = get_writer().execute(
+        _insert_synced_note, user_id, title, content, created_at,
+        snapshot_every=current_app.config["REVISION_SNAPSHOT_INTERVAL"],
+    )
+    if note_id is not None:
+        get_suggest_index().add(user_id, "note", note_id, title)
+        get_related_index().note_saved(user_id, note_id, title, content)
+    return note_id
+
+
+def insert_synced_notes(user_id, notes):
+    """
+    Insert a batch of synced notes as a single write.
+    `notes` is a list of dicts with title, content and created_at.
+    Returns the ids of the notes that were actually inserted.
+    """
+    snapshot_every = current_app.config["REVISION_SNAPSHOT_INTERVAL"]
+
+    def op(db):
+        inserted = []
+        for note in notes:
+            note_id = _insert_synced_note(
+                db, user_id, note["title"], note["content"], note["created_at"],
+                snapshot_every=snapshot_every,
+            )
+            if note_id is not None:
+                inserted.append((note_id, note["title"], note["content"]))
+        return inserted
+
+    inserted = get_writer().execute(op)
+    suggest_index = get_suggest_index()
+    related_index = get_related_index()
+    for note_id, title, content in inserted:
+        suggest_index.add(user_id, "note", note_id, title)
+        related_index.note_saved(user_id, note_id, title, content)
+    return [note_id for note_id, _, _ in inserted]
+
+
+# ============================================================
+# USER REGISTRATION
+# ============================================================
+
+def create_user(username, password_hash):
+    """Create a user and return its id."""
+    def op(db):
+        cur = db.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+            (username, password_hash),
+        )
+        return cur.lastrowid
+
+    return get_writer().execute(op)
 
 
 # ============================================================
 # DATABASE SCHEMA SETUP
 # ============================================================
 
+def _add_content_hash(db):
+    """Add and backfill notes.content_hash on databases created before it existed."""
+    columns = {row[1] for row in db.execute("PRAGMA table_info(notes)").fetchall()}
+    if "content_hash" not in columns:
+        db.execute("ALTER TABLE notes ADD COLUMN content_hash TEXT")
+
+    rows = db.execute("SELECT id, content FROM notes WHERE content_hash IS NULL").fetchall()
+    db.executemany(
+        "UPDATE notes SET content_hash = ? WHERE id = ?",
+        [(content_hash(row[1]), row[0]) for row in rows],
+    )
+
+
 def create_tables(db):
     """
     Creates all required tables.
     Automatically called by `flask init-db`.
     """
 
+    # WAL, and incremental auto_vacuum on a fresh database
+    # (`app.py maintain --convert` converts old ones)
+    enable_wal(db)
+
     db.execute(
         """
         CREATE TABLE IF NOT EXISTS users (
@@ -220,6 +514,7 @@ def create_tables(db):
             user_id INTEGER NOT NULL,
             title TEXT,
             content TEXT,
+            content_hash TEXT,             -- SHA-256 of content; keys the Markdown render cache
             category_id INTEGER,
             pinned INTEGER DEFAULT 0,
             reminder TEXT,                 -- stored as ISO timestamp string
@@ -231,23 +526,96 @@ def create_tables(db):
         );
         """
     )
-    
+
+    _add_content_hash(db)
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS note_revisions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            note_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            revision INTEGER NOT NULL,
+            kind TEXT NOT NULL,            -- 'full' snapshot or 'delta' vs previous
+            title TEXT,
+            data BLOB NOT NULL,            -- zlib-compressed JSON
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+
+            UNIQUE (note_id, revision),
+            FOREIGN KEY (note_id) REFERENCES notes(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+        """
+    )
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS note_attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            note_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            hash TEXT NOT NULL,            -- SHA-256 of the file in the attachment store
+            filename TEXT,
+            mimetype TEXT,
+            size INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+
+            FOREIGN KEY (note_id) REFERENCES notes(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+        """
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS idx_note_attachments_note ON note_attachments(note_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_note_attachments_hash ON note_attachments(hash)")
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,          -- queued, running, done, failed, cancelled
+            progress REAL DEFAULT 0,
+            message TEXT,
+            params TEXT,                   -- JSON
+            result TEXT,                   -- JSON
+            error TEXT,
+            cancel_requested INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            started_at TEXT,
+            finished_at TEXT,
+
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+        """
+    )
 
     db.commit()
 
 
 __all__ = [
     "User",
+    "Note",
+    "Category",
     "get_user_by_id",
     "get_user_by_username",
     "create_note",
     "get_notes_by_user",
+    "iter_notes",
     "get_note_by_id",
+    "get_note_for_export",
     "update_note",
     "delete_note",
     "search_notes",
     "create_category",
+    "rename_category",
+    "delete_category",
     "get_categories",
+    "get_categories_json",
+    "get_suggest_entries",
+    "get_note_texts",
     "insert_synced_note",
+    "insert_synced_notes",
+    "create_user",
     "create_tables",
 ]
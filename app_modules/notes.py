@@ -2,13 +2,16 @@
 
 from flask import (
     Blueprint,
+    Response,
     render_template,
+    stream_template,
     request,
     redirect,
     url_for,
     flash,
     jsonify,
-    send_file
+    send_file,
+    current_app,
 )
 from flask_login import login_required, current_user
 
@@ -17,10 +20,29 @@ from .models import (
     update_note,
     delete_note,
     get_note_by_id,
+    get_note_for_export,
     get_notes_by_user,
+    iter_notes,
     search_notes,
     get_categories,
+    get_suggest_entries,
+    get_note_texts,
 )
+from .suggest import get_suggest_index
+from .related import get_related_index
+from .revisions import get_revisions, get_revision
+from .attachments import (
+    add_attachment,
+    delete_attachment,
+    get_attachment,
+    get_attachment_store,
+    get_note_attachments,
+    INLINE_MIMETYPES,
+)
+from .streaming import flush_at_markers
+from .rendering import render_note
+from markupsafe import escape
+from werkzeug.utils import secure_filename
 import io
 
 notes_bp = Blueprint("notes",  __name__, template_folder="../template", url_prefix="/notes")
@@ -33,14 +55,26 @@ notes_bp = Blueprint("notes",  __name__, template_folder="../template", url_pref
 @login_required
 def dashboard():
     query = request.args.get("q", "").strip()
+    categories = get_categories(current_user.id)
+
+    # Streaming: the page shell is flushed before the notes query runs,
+    # then cards follow in chunks straight off the cursor.
+    if current_app.config["DASHBOARD_STREAMING"]:
+        chunk = current_app.config["DASHBOARD_STREAM_CHUNK"]
+        stream = stream_template(
+            "dashboard.html",
+            notes=iter_notes(current_user.id, query, chunk_size=chunk),
+            categories=categories,
+            query=query,
+            flush_every=chunk,
+        )
+        return Response(flush_at_markers(stream), mimetype="text/html")
 
     if query:
         notes = search_notes(current_user.id, query)
     else:
         notes = get_notes_by_user(current_user.id)
 
-    categories = get_categories(current_user.id)
-
     return render_template(
         "dashboard.html",
         notes=notes,
@@ -49,6 +83,36 @@ def dashboard():
     )
 
 
+# -----------------------------------------------------------
+# TYPEAHEAD SUGGESTIONS (titles + category names)
+# -----------------------------------------------------------
+@notes_bp.get("/api/suggest")
+@login_required
+def suggest():
+    prefix = request.args.get("prefix", "").strip()
+    if not prefix:
+        return jsonify([])
+
+    limit = current_app.config["SUGGEST_LIMIT"]
+    results = get_suggest_index().suggest(
+        current_user.id, prefix, get_suggest_entries, limit=limit
+    )
+    return jsonify(results)
+
+
+# -----------------------------------------------------------
+# RELATED NOTES (TF-IDF cosine similarity)
+# -----------------------------------------------------------
+@notes_bp.get("/api/related/<int:note_id>")
+@login_required
+def related(note_id):
+    k = request.args.get("k", current_app.config["RELATED_TOP_K"], type=int)
+    results = get_related_index().related(
+        current_user.id, note_id, get_note_texts, k=max(1, min(k, 50))
+    )
+    return jsonify(results)
+
+
 # -----------------------------------------------------------
 # CREATE NOTE
 # -----------------------------------------------------------
@@ -111,11 +175,13 @@ def edit(note_id):
         return redirect(url_for("notes.dashboard"))
 
     categories = get_categories(current_user.id)
+    attachments = get_note_attachments(note_id, current_user.id)
 
     return render_template(
         "note_edit.html",
         note=note,
         categories=categories,
+        attachments=attachments,
         mode="edit",
     )
 
@@ -145,21 +211,135 @@ def pin(note_id):
     if not note:
         return jsonify({"status": "error", "msg": "Note not found"}), 404
 
-    new_state = 0 if note["pinned"] else 1
+    new_state = 0 if note.pinned else 1
 
     update_note(
         note_id,
         user_id=current_user.id,
-        title=note["title"],
-        content=note["content"],
-        category_id=note["category_id"],
+        title=note.title,
+        content=note.content,
+        category_id=note.category_id,
         pinned=new_state,
-        reminder=note["reminder"],
+        reminder=note.reminder,
     )
 
     return jsonify({"status": "success", "pinned": bool(new_state)})
 
 
+# -----------------------------------------------------------
+# REVISION HISTORY
+# -----------------------------------------------------------
+@notes_bp.get("/history/<int:note_id>")
+@login_required
+def history(note_id):
+    note = get_note_by_id(note_id, current_user.id)
+    if not note:
+        return jsonify({"status": "error", "msg": "Note not found"}), 404
+
+    revisions = get_revisions(note_id, current_user.id)
+    return jsonify([dict(row) for row in revisions])
+
+
+@notes_bp.get("/history/<int:note_id>/<int:revision>")
+@login_required
+def history_revision(note_id, revision):
+    data = get_revision(note_id, current_user.id, revision)
+    if not data:
+        return jsonify({"status": "error", "msg": "Revision not found"}), 404
+
+    return jsonify(data)
+
+
+@notes_bp.post("/history/<int:note_id>/<int:revision>/restore")
+@login_required
+def history_restore(note_id, revision):
+    note = get_note_by_id(note_id, current_user.id)
+    data = get_revision(note_id, current_user.id, revision)
+    if not note or not data:
+        return jsonify({"status": "error", "msg": "Revision not found"}), 404
+
+    # Restoring is itself a new revision, so it can be undone too
+    update_note(
+        note_id,
+        user_id=current_user.id,
+        title=data["title"],
+        content=data["content"],
+        category_id=note.category_id,
+        pinned=note.pinned,
+        reminder=note.reminder,
+    )
+
+    return jsonify({"status": "success", "restored": revision})
+
+
+# -----------------------------------------------------------
+# ATTACHMENTS
+# -----------------------------------------------------------
+@notes_bp.post("/<int:note_id>/attachments")
+@login_required
+def upload_attachment(note_id):
+    if not get_note_by_id(note_id, current_user.id):
+        return jsonify({"status": "error", "msg": "Note not found"}), 404
+
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"status": "error", "msg": "File missing"}), 400
+
+    filename = secure_filename(upload.filename) or "attachment"
+    try:
+        attachment_id = add_attachment(
+            note_id,
+            current_user.id,
+            upload.stream,
+            filename,
+            upload.mimetype or "application/octet-stream",
+        )
+    except ValueError as exc:
+        return jsonify({"status": "error", "msg": str(exc)}), 413
+
+    return jsonify({
+        "status": "success",
+        "id": attachment_id,
+        "filename": filename,
+        "url": url_for("notes.attachment", attachment_id=attachment_id),
+    })
+
+
+@notes_bp.get("/attachments/<int:attachment_id>")
+@login_required
+def attachment(attachment_id):
+    row = get_attachment(attachment_id, current_user.id)
+    if not row:
+        return jsonify({"status": "error", "msg": "Attachment not found"}), 404
+
+    # Range and If-None-Match are handled by send_file (or the front
+    # server when USE_X_SENDFILE is on); the content hash is the ETag.
+    # The mimetype comes from the uploader, so only known image types are
+    # shown inline and the browser must not sniff anything else.
+    response = send_file(
+        get_attachment_store().path(row["hash"]),
+        mimetype=row["mimetype"],
+        as_attachment=row["mimetype"] not in INLINE_MIMETYPES,
+        download_name=row["filename"],
+        conditional=True,
+        etag=row["hash"],
+        max_age=0,
+    )
+    response.cache_control.private = True
+    response.cache_control.public = False
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+@notes_bp.delete("/attachments/<int:attachment_id>")
+@login_required
+def remove_attachment(attachment_id):
+    if not delete_attachment(attachment_id, current_user.id):
+        return jsonify({"status": "error", "msg": "Attachment not found"}), 404
+
+    return jsonify({"status": "success"})
+
+
 # -----------------------------------------------------------
 # SYNC ENDPOINT
 # (Optional – used by /static/js/sync.js)
@@ -172,10 +352,16 @@ def sync():
     Actual merging happens in sync.py (which you’ll add next).
     """
     from .sync import sync_local_to_cloud
+    from .jobs import get_job_runner
 
     data = request.get_json()
     local_notes = data.get("notes", [])
 
+    # Large syncs run in the background; the client polls /jobs/<id>
+    if isinstance(local_notes, list) and len(local_notes) > current_app.config["SYNC_INLINE_LIMIT"]:
+        job_id = get_job_runner().enqueue(current_user.id, "sync", {"notes": local_notes})
+        return jsonify({"status": "queued", "job_id": job_id}), 202
+
     sync_local_to_cloud(current_user.id, local_notes)
 
     return jsonify({"status": "success"})
@@ -183,27 +369,44 @@ def sync():
 
 
 # ===============================================
-# DOWNLOAD NOTE AS .TXT
+# DOWNLOAD NOTE AS .TXT / .MD / .HTML
 # ===============================================
+EXPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
 @notes_bp.get("/notes/download/<int:note_id>")
 @login_required
 def download_note(note_id):
     # Get note
-    note = get_note_by_id(note_id, current_user.id)
+    note = get_note_for_export(note_id, current_user.id)
 
     if not note:
         flash("Note not found")
         return redirect(url_for("notes.dashboard"))
 
     # Prepare content
-    title = note["title"] or "Untitled"
-    content = note["content"] or ""
-
-    text_data = f"{title}\n\n{content}"
+    title = note.title or "Untitled"
+    content = note.content or ""
+    fmt = request.args.get("format", "txt")
+
+    if fmt == "md":
+        data, mimetype = f"# {title}\n\n{content}\n", "text/markdown"
+    elif fmt == "html":
+        data = EXPORT_TEMPLATE.format(title=escape(title), body=render_note(note))
+        mimetype = "text/html"
+    else:
+        fmt, data, mimetype = "txt", f"{title}\n\n{content}", "text/plain"
 
     return send_file(
-        io.BytesIO(text_data.encode("utf-8")),
-        mimetype="text/plain",
+        io.BytesIO(data.encode("utf-8")),
+        mimetype=mimetype,
         as_attachment=True,
-        download_name=f"{title}.txt"
+        download_name=f"{title}.{fmt}"
     )
\ No newline at end of file
@@ -0,0 +1,155 @@
+# app_modules/profiler.py
+
+import os
+import sys
+import time
+import hmac
+import threading
+from collections import Counter
+
+from flask import Blueprint, current_app, request, jsonify, Response
+from flask_login import current_user
+
+from .ratelimit import get_rate_limiter
+
+
+# ============================================================
+# SAMPLING PROFILER
+# ============================================================
+
+class SamplingProfiler:
+    """
+    Stack-sampling profiler for all threads of this process.
+
+    Nothing runs until `profile()` is called: for the requested window
+    it reads `sys._current_frames()` every `interval` seconds and
+    returns collapsed stacks ("a;b;c count"), ready for flamegraph.pl
+    or speedscope. Each stack is rooted at the
+    Flask endpoint the thread is serving (see tag/untag) or, for
+    non-request threads, the thread name.
+    """
+
+    def __init__(self, interval=0.005, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._endpoints = {}  # thread id -> endpoint currently being served
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------------
+    # REQUEST TAGGING (before_request / teardown_request)
+    # -----------------------------------------------------------
+
+    def tag(self):
+        self._endpoints[threading.get_ident()] = request.endpoint or "unknown"
+
+    def untag(self, exc=None):
+        self._endpoints.pop(threading.get_ident(), None)
+
+    # -----------------------------------------------------------
+    # SAMPLING
+    # -----------------------------------------------------------
+
+    def profile(self, seconds):
+        """
+        Sample every other thread for `seconds` from the calling thread.
+        Returns (samples, stacks) where stacks is a Counter of collapsed
+        stack strings. Raises RuntimeError if a profile is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running.")
+
+        try:
+            stacks = Counter()
+            samples = 0
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+
+            while time.monotonic() < deadline:
+                self._sample(stacks, skip=me)
+                samples += 1
+                time.sleep(self.interval)
+
+            return samples, stacks
+        finally:
+            self._lock.release()
+
+    def _sample(self, stacks, skip):
+        names = {t.ident: t.name for t in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip:
+                continue
+
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+
+            root = self._endpoints.get(thread_id) or names.get(thread_id, f"thread-{thread_id}")
+            frames.append(root)
+            frames.reverse()
+            stacks[";".join(frames)] += 1
+
+
+def collapse(stacks):
+    """Render stacks as collapsed-stack text, heaviest first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def get_profiler():
+    """Return the app-wide SamplingProfiler."""
+    return current_app.extensions["profiler"]
+
+
+# ============================================================
+# ENDPOINTS (admins or X-Profile-Token only)
+# ============================================================
+
+debug_bp = Blueprint("debug", __name__, url_prefix="/debug")
+
+
+def _is_authorized():
+    token = current_app.config["PROFILE_TOKEN"]
+    supplied = request.headers.get("X-Profile-Token", "")
+    if token and supplied and hmac.compare_digest(token, supplied):
+        return True
+
+    return (
+        current_user.is_authenticated
+        and current_user.username in current_app.config["ADMIN_USERNAMES"]
+    )
+
+
+@debug_bp.get("/profile")
+def profile():
+    if not _is_authorized():
+        return jsonify({"status": "error", "msg": "Forbidden"}), 403
+
+    seconds = request.args.get("seconds", 10, type=float)
+    seconds = max(0.1, min(seconds, current_app.config["PROFILE_MAX_SECONDS"]))
+
+    try:
+        samples, stacks = get_profiler().profile(seconds)
+    except RuntimeError as exc:
+        return jsonify({"status": "error", "msg": str(exc)}), 409
+
+    response = Response(collapse(stacks), mimetype="text/plain")
+    response.headers["X-Profile-Samples"] = str(samples)
+    return response
+
+
+@debug_bp.get("/ratelimit")
+def ratelimit_counters():
+    if not _is_authorized():
+        return jsonify({"status": "error", "msg": "Forbidden"}), 403
+
+    return jsonify(get_rate_limiter().counters())
+
+
+__all__ = [
+    "SamplingProfiler",
+    "collapse",
+    "get_profiler",
+    "debug_bp",
+]
@@ -0,0 +1,169 @@
+# app_modules/ratelimit.py
+
+import math
+import time
+import threading
+from collections import Counter
+
+from flask import current_app, request, jsonify
+from flask_login import current_user
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class RateLimitBackend:
+    """
+    Storage for token buckets. Subclass and implement `take()` to keep
+    buckets somewhere shared (e.g. Redis) when running several workers.
+    """
+
+    def take(self, key, cost, rate, burst):
+        """
+        Try to remove `cost` tokens from the bucket `key`, which refills at
+        `rate` tokens/second up to `burst`. Return (allowed, retry_after)
+        where retry_after is the number of seconds until it would succeed.
+        """
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Process-local token buckets (one dict, one lock)."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, last_refill)
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed = False
+                retry_after = (cost - tokens) / rate if rate > 0 else float("inf")
+
+            if len(self._buckets) > self.max_keys:
+                self._prune(now, rate, burst)
+
+        return allowed, retry_after
+
+    def _prune(self, now, rate, burst):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = burst / rate if rate > 0 else float("inf")
+        stale = [k for k, (_, last) in self._buckets.items() if now - last >= full_after]
+        for key in stale:
+            del self._buckets[key]
+
+
+# ============================================================
+# LIMITER
+# ============================================================
+
+class RateLimiter:
+    """
+    Per-client token-bucket admission control for expensive endpoints.
+
+    Each client (user id when logged in, IP address otherwise) owns one
+    bucket; every limited endpoint draws its configured cost from it.
+    Throttled and admitted requests are counted per endpoint.
+    """
+
+    def __init__(self, backend=None, rate=2.0, burst=30, costs=None):
+        self.backend = backend or MemoryBackend()
+        self.rate = rate
+        self.burst = burst
+        self.costs = dict(costs or {})
+
+        self.throttled = Counter()
+        self.admitted = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, client_key, name):
+        """Return (allowed, retry_after) for a request to endpoint `name`."""
+        cost = self.costs.get(name)
+        if not cost:
+            return True, 0.0
+
+        allowed, retry_after = self.backend.take(client_key, cost, self.rate, self.burst)
+
+        with self._lock:
+            if allowed:
+                self.admitted[name] += 1
+            else:
+                self.throttled[name] += 1
+
+        return allowed, retry_after
+
+    def counters(self):
+        """Admitted/throttled request counts per endpoint (see /debug/ratelimit)."""
+        with self._lock:
+            return {
+                "admitted": dict(self.admitted),
+                "throttled": dict(self.throttled),
+            }
+
+
+# ============================================================
+# FLASK INTEGRATION
+# ============================================================
+
+def get_rate_limiter():
+    """Return the app-wide RateLimiter."""
+    return current_app.extensions["ratelimit"]
+
+
+def _limit_name():
+    """Map the current request to a cost name in RATE_LIMIT_COSTS."""
+    endpoint = request.endpoint
+
+    # Only the search variant of the dashboard runs the full LIKE scan
+    if endpoint == "notes.dashboard":
+        return "notes.search" if request.args.get("q", "").strip() else None
+
+    # Only actual login attempts are limited, not the form itself
+    if endpoint == "auth.login" and request.method != "POST":
+        return None
+
+    return endpoint
+
+
+def _client_key():
+    if current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    return f"ip:{request.remote_addr}"
+
+
+def enforce_rate_limit():
+    """before_request hook: reject the request with 429 when over budget."""
+    if not current_app.config["RATE_LIMIT_ENABLED"]:
+        return None
+
+    name = _limit_name()
+    if name is None:
+        return None
+
+    allowed, retry_after = get_rate_limiter().check(_client_key(), name)
+    if allowed:
+        return None
+
+    response = jsonify({"status": "error", "msg": "Too many requests"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(min(retry_after, 3600))))
+    return response
+
+
+__all__ = [
+    "RateLimitBackend",
+    "MemoryBackend",
+    "RateLimiter",
+    "get_rate_limiter",
+    "enforce_rate_limit",
+]
@@ -0,0 +1,260 @@
+# app_modules/related.py
+
+import re
+import time
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+from flask import current_app
+
+
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his i in is it its
+me my no not of on or our she so that the their them there they this to
+was we were what when which who will with you your
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+# ============================================================
+# PER-USER TF-IDF CORPUS
+# ============================================================
+
+class UserCorpus:
+    """
+    Sparse term counts for one user's notes.
+
+    Updates only touch the changed note's counts and document
+    frequencies. The TF-IDF matrix (CSR arrays: indptr/indices/data,
+    rows L2-normalised) is rebuilt lazily on the next query, and
+    top-k cosine similarity against every note is one vectorised
+    multiply + bincount over the non-zeros.
+    """
+
+    def __init__(self):
+        self.vocab = {}      # term -> column
+        self.df = Counter()  # column -> number of notes containing it
+        self.docs = {}       # note_id -> {column: count}
+        self.titles = {}     # note_id -> title
+        self._matrix = None
+        self._results = {}   # (note_id, k) -> results, valid until next change
+
+    def set_note(self, note_id, title, content):
+        self.remove_note(note_id)
+        self.titles[note_id] = title
+
+        counts = Counter()
+        for term in tokenize(f"{title or ''} {content or ''}"):
+            counts[self.vocab.setdefault(term, len(self.vocab))] += 1
+
+        if counts:
+            self.docs[note_id] = dict(counts)
+            for col in counts:
+                self.df[col] += 1
+        self._invalidate()
+
+    def remove_note(self, note_id):
+        self.titles.pop(note_id, None)
+        counts = self.docs.pop(note_id, None)
+        if counts:
+            for col in counts:
+                self.df[col] -= 1
+        self._invalidate()
+
+    def _invalidate(self):
+        self._matrix = None
+        self._results.clear()
+
+    def _build(self):
+        ids = list(self.docs)
+        n = len(ids)
+        lengths = np.fromiter((len(self.docs[i]) for i in ids), dtype=np.int64, count=n)
+        nnz = int(lengths.sum())
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.fromiter(
+            (col for i in ids for col in self.docs[i]), dtype=np.int64, count=nnz
+        )
+        counts = np.fromiter(
+            (c for i in ids for c in self.docs[i].values()), dtype=np.float64, count=nnz
+        )
+
+        df = np.zeros(len(self.vocab), dtype=np.float64)
+        if self.df:
+            cols = np.fromiter(self.df.keys(), dtype=np.int64, count=len(self.df))
+            df[cols] = np.fromiter(self.df.values(), dtype=np.float64, count=len(self.df))
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+
+        rows = np.repeat(np.arange(n), lengths)
+        data = (1.0 + np.log(counts)) * idf[indices]
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=n))
+        data /= norms[rows]
+
+        self._matrix = {
+            "ids": np.array(ids, dtype=np.int64),
+            "pos": {note_id: p for p, note_id in enumerate(ids)},
+            "indptr": indptr,
+            "indices": indices,
+            "data": data,
+            "rows": rows,
+        }
+
+    def related(self, note_id, k=5):
+        """Return up to k (note_id, title, score) most similar to note_id."""
+        key = (note_id, k)
+        if key in self._results:
+            return self._results[key]
+
+        if note_id not in self.docs:
+            return []
+        if self._matrix is None:
+            self._build()
+
+        m = self._matrix
+        n = len(m["ids"])
+        pos = m["pos"][note_id]
+        start, end = m["indptr"][pos], m["indptr"][pos + 1]
+
+        query = np.zeros(len(self.vocab), dtype=np.float64)
+        query[m["indices"][start:end]] = m["data"][start:end]
+
+        scores = np.bincount(m["rows"], weights=m["data"] * query[m["indices"]], minlength=n)
+        scores[pos] = 0.0
+
+        k = min(k, n - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = [
+            {
+                "id": int(m["ids"][p]),
+                "title": self.titles.get(int(m["ids"][p])) or "Untitled",
+                "score": round(float(scores[p]), 4),
+            }
+            for p in top
+            if scores[p] > 0
+        ]
+        self._results[key] = results
+        return results
+
+
+# ============================================================
+# LRU CACHE OF USER CORPORA
+# ============================================================
+
+class RelatedNotesCache:
+    """
+    One UserCorpus per active user: built lazily from the DB on first
+    query, updated by the model write paths, evicted LRU / when idle.
+    """
+
+    def __init__(self, max_users=64, idle_seconds=600):
+        self.max_users = max_users
+        self.idle_seconds = idle_seconds
+
+        self._corpora = OrderedDict()  # user_id -> (corpus, last_used)
+        self._generations = {}         # user_id -> writes seen, only while building
+        self._builders = Counter()     # user_id -> builds in progress
+        self._lock = threading.Lock()
+
+    def related(self, user_id, note_id, loader, k=5):
+        """`loader(user_id)` returns (id, title, content) rows for all notes."""
+        user_id = str(user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+            cached = self._corpora.get(user_id)
+            if cached is not None:
+                self._corpora[user_id] = (cached[0], now)
+                self._corpora.move_to_end(user_id)
+                return cached[0].related(note_id, k)
+
+        corpus = self._build(user_id, loader)
+        with self._lock:
+            return corpus.related(note_id, k)
+
+    # -----------------------------------------------------------
+    # WRITE-PATH HOOKS (called after the write has committed)
+    # -----------------------------------------------------------
+
+    def note_saved(self, user_id, note_id, title, content):
+        self._apply(user_id, lambda c: c.set_note(note_id, title, content))
+
+    def note_deleted(self, user_id, note_id):
+        self._apply(user_id, lambda c: c.remove_note(note_id))
+
+    # -----------------------------------------------------------
+    # INTERNALS
+    # -----------------------------------------------------------
+
+    def _apply(self, user_id, change):
+        user_id = str(user_id)
+        with self._lock:
+            if user_id in self._generations:
+                self._generations[user_id] += 1
+            cached = self._corpora.get(user_id)
+            if cached is not None:
+                change(cached[0])
+
+    def _build(self, user_id, loader):
+        # Rebuild if a write landed while we were reading the notes
+        with self._lock:
+            self._builders[user_id] += 1
+            self._generations.setdefault(user_id, 0)
+
+        try:
+            for _ in range(3):
+                with self._lock:
+                    generation = self._generations[user_id]
+
+                corpus = UserCorpus()
+                for note_id, title, content in loader(user_id):
+                    corpus.set_note(note_id, title, content)
+
+                with self._lock:
+                    if self._generations[user_id] == generation:
+                        break
+
+            with self._lock:
+                self._corpora[user_id] = (corpus, time.monotonic())
+                self._corpora.move_to_end(user_id)
+                while len(self._corpora) > self.max_users:
+                    self._corpora.popitem(last=False)
+        finally:
+            with self._lock:
+                self._builders[user_id] -= 1
+                if not self._builders[user_id]:
+                    del self._builders[user_id]
+                    del self._generations[user_id]
+
+        return corpus
+
+    def _evict_idle(self, now):
+        while self._corpora:
+            _, (_, last_used) = next(iter(self._corpora.items()))
+            if now - last_used <= self.idle_seconds:
+                break
+            self._corpora.popitem(last=False)
+
+
+def get_related_index():
+    """Return the app-wide RelatedNotesCache."""
+    return current_app.extensions["related"]
+
+
+__all__ = [
+    "tokenize",
+    "UserCorpus",
+    "RelatedNotesCache",
+    "get_related_index",
+]
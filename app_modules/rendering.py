@@ -0,0 +1,266 @@
+# app_modules/rendering.py
+
+import re
+import html
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from markupsafe import Markup
+
+
+# ============================================================
+# MARKDOWN → HTML (escape first, so output is safe by construction)
+# ============================================================
+#
+# Supported: ATX headings, paragraphs (line breaks kept), "-"/"*"/"+"
+# and numbered lists, > blockquotes, ``` fenced code, --- rules, and
+# inline `code`, **bold**, *italic*, [links](https://...).
+# Every piece of source text is HTML-escaped before any tag is added,
+# and the renderer only ever emits the tags above, so raw HTML in a
+# note is shown as text. Links are limited to http(s), mailto and
+# relative URLs.
+
+FENCE_RE = re.compile(r"^\s*(```|~~~)\s*([\w+-]*)\s*$")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+RULE_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+QUOTE_RE = re.compile(r"^\s*>\s?(.*)$")
+UL_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+OL_RE = re.compile(r"^\s*\d{1,9}[.)]\s+(.*)$")
+
+CODE_SPAN_RE = re.compile(r"(`+)(.+?)\1")
+LINK_RE = re.compile(r"\[([^\]\n]+)\]\(([^)\s]+)\)")
+STRONG_EM_RE = re.compile(r"\*\*\*(?=\S)(.+?)(?<=\S)\*\*\*|(?<!\w)___(?=\S)(.+?)(?<=\S)___(?!\w)")
+STRONG_RE = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)")
+EM_RE = re.compile(r"(?<!\*)\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?!\*)|(?<!\w)_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)")
+SAFE_URL_RE = re.compile(r"^(https?:|mailto:|/(?!/)|#|\./|\.\./|[\w.-]+/?$)", re.I)
+
+PLACEHOLDER_RE = re.compile(r"\x00(\d+)\x00")
+
+MAX_QUOTE_DEPTH = 8
+MAX_EMPHASIS_DEPTH = 4
+
+
+def _inline(text):
+    """Escape one run of text and apply inline markup."""
+    stash = []
+
+    def keep(fragment):
+        stash.append(fragment)
+        return f"\x00{len(stash) - 1}\x00"
+
+    def link(m):
+        label, url = m.group(1), html.unescape(m.group(2))
+        # A code span inside the URL is a placeholder by now: not a link
+        if "\x00" in url or not SAFE_URL_RE.match(url):
+            return m.group(0)
+        href = html.escape(url, quote=True)
+        return keep(f'<a href="{href}" rel="nofollow noopener noreferrer">{_emphasis(label, keep)}</a>')
+
+    parts = []
+    for i, piece in enumerate(CODE_SPAN_RE.split(text)):
+        # split() yields text, fence, code, text, fence, code, ...
+        if i % 3 == 0:
+            parts.append(html.escape(piece, quote=True))
+        elif i % 3 == 2:
+            parts.append(keep(f"<code>{html.escape(piece.strip())}</code>"))
+
+    out = _emphasis(LINK_RE.sub(link, "".join(parts)), keep)
+
+    # Stashed fragments can contain placeholders of earlier ones
+    replaced = 1
+    while replaced:
+        out, replaced = PLACEHOLDER_RE.subn(lambda m: stash[int(m.group(1))], out)
+    return out
+
+
+def _emphasis(text, keep, depth=0):
+    """
+    Bold/italic. Each element is stashed as soon as it is built, so a
+    later pattern can never match across its tags (no misnesting).
+    """
+    def wrap(open_tag, close_tag):
+        def replace(m):
+            inner = m.group(1) or m.group(2)
+            if depth < MAX_EMPHASIS_DEPTH:
+                inner = _emphasis(inner, keep, depth + 1)
+            return keep(f"{open_tag}{inner}{close_tag}")
+        return replace
+
+    text = STRONG_EM_RE.sub(wrap("<strong><em>", "</em></strong>"), text)
+    text = STRONG_RE.sub(wrap("<strong>", "</strong>"), text)
+    return EM_RE.sub(wrap("<em>", "</em>"), text)
+
+
+def _render_lines(lines, depth=0):
+    out = []
+    paragraph = []
+    items = []
+    list_tag = None
+
+    def flush_paragraph():
+        if paragraph:
+            out.append("<p>" + "<br>\n".join(_inline(l.strip()) for l in paragraph) + "</p>")
+            paragraph.clear()
+
+    def flush_list():
+        nonlocal list_tag
+        if items:
+            body = "".join(f"<li>{_inline(' '.join(item))}</li>" for item in items)
+            out.append(f"<{list_tag}>{body}</{list_tag}>")
+            items.clear()
+        list_tag = None
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        fence = FENCE_RE.match(line)
+        if fence:
+            flush_paragraph()
+            flush_list()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(fence.group(1)):
+                code.append(lines[i])
+                i += 1
+            lang = f' class="language-{fence.group(2)}"' if fence.group(2) else ""
+            out.append(f"<pre><code{lang}>{html.escape(chr(10).join(code))}</code></pre>")
+            i += 1
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            flush_list()
+            i += 1
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            flush_paragraph()
+            flush_list()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+            i += 1
+            continue
+
+        if RULE_RE.match(line):
+            flush_paragraph()
+            flush_list()
+            out.append("<hr>")
+            i += 1
+            continue
+
+        if QUOTE_RE.match(line) and depth < MAX_QUOTE_DEPTH:
+            flush_paragraph()
+            flush_list()
+            quoted = []
+            while i < len(lines) and QUOTE_RE.match(lines[i]):
+                quoted.append(QUOTE_RE.match(lines[i]).group(1))
+                i += 1
+            out.append(f"<blockquote>{_render_lines(quoted, depth + 1)}</blockquote>")
+            continue
+
+        ul, ol = UL_RE.match(line), OL_RE.match(line)
+        if ul or ol:
+            flush_paragraph()
+            tag = "ul" if ul else "ol"
+            if list_tag != tag:
+                flush_list()
+                list_tag = tag
+            items.append([(ul or ol).group(1)])
+            i += 1
+            continue
+
+        if items and line[:1].isspace():
+            items[-1].append(line.strip())  # continuation of the last item
+        else:
+            flush_list()
+            paragraph.append(line)
+        i += 1
+
+    flush_paragraph()
+    flush_list()
+    return "\n".join(out)
+
+
+def render_markdown(text):
+    """Render note Markdown to sanitized HTML."""
+    text = (text or "").replace("\x00", "").replace("\r\n", "\n").replace("\r", "\n")
+    return _render_lines(text.split("\n"))
+
+
+def content_hash(content):
+    """Hash stored on a note at write time; keys the render cache."""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+# ============================================================
+# BOUNDED RENDER CACHE
+# ============================================================
+
+class RenderCache:
+    """
+    LRU of rendered HTML keyed by (content hash, preview length).
+    The same content always renders the same, so entries never go
+    stale; edits simply produce a new key and old ones age out.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        with self._lock:
+            html_ = self._entries.get(key)
+            if html_ is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html_
+            self.misses += 1
+
+        html_ = render()
+
+        with self._lock:
+            self._entries[key] = html_
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html_
+
+
+def get_render_cache():
+    """Return the app-wide RenderCache."""
+    return current_app.extensions["markdown"]
+
+
+def render_note(note, preview_chars=None):
+    """
+    Jinja helper: a note's content as sanitized HTML, from the cache.
+    With preview_chars, only the start of the note is rendered (cards,
+    whose content is already cut to the preview length); without it the
+    note must carry its full content.
+    """
+    content = note.content or ""
+    digest = getattr(note, "content_hash", None) or content_hash(content)
+
+    def render():
+        source = content
+        if preview_chars is not None and len(source) > preview_chars:
+            source = source[:preview_chars].rstrip() + "…"
+        return render_markdown(source)
+
+    return Markup(get_render_cache().get((digest, preview_chars), render))
+
+
+__all__ = [
+    "render_markdown",
+    "content_hash",
+    "RenderCache",
+    "get_render_cache",
+    "render_note",
+]
@@ -0,0 +1,253 @@
+# app_modules/revisions.py
+
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from . import get_db, get_writer
+
+
+# ============================================================
+# DELTA ENCODING
+# ============================================================
+#
+# Content is diffed line by line against the previous revision.
+# A delta is a list of ops:
+#   ["c", start, end]  -> copy lines[start:end] from the previous revision
+#   ["i", [lines...]]  -> insert these new lines
+# Deltas and snapshots are JSON, zlib-compressed into one BLOB.
+
+def _pack(obj):
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def make_delta(old, new):
+    """Return a line-based delta turning `old` into `new`."""
+    old_lines = (old or "").splitlines(keepends=True)
+    new_lines = (new or "").splitlines(keepends=True)
+
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i", new_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(old, ops):
+    """Rebuild the new content from `old` and a delta made by make_delta()."""
+    old_lines = (old or "").splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if op[0] == "c":
+            parts.extend(old_lines[op[1]:op[2]])
+        else:
+            parts.extend(op[1])
+    return "".join(parts)
+
+
+# ============================================================
+# WRITER-SIDE HELPERS (run inside a WriteQueue transaction)
+# ============================================================
+
+def _latest_revision(db, note_id):
+    return db.execute(
+        "SELECT MAX(revision) AS rev FROM note_revisions WHERE note_id = ?",
+        (note_id,),
+    ).fetchone()["rev"]
+
+
+def _insert_revision(db, note_id, user_id, revision, kind, title, payload):
+    db.execute(
+        """
+        INSERT INTO note_revisions (note_id, user_id, revision, kind, title, data, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+        (note_id, user_id, revision, kind, title, payload),
+    )
+
+
+def record_revision(db, note_id, user_id, title, content, previous=None, snapshot_every=20):
+    """
+    Store (title, content) as the next revision of a note.
+
+    `previous` is the note's (title, content) before this write, or None
+    for a new note. Every `snapshot_every` revisions (or whenever a delta
+    would not be smaller) a full snapshot is written, which bounds the
+    number of deltas applied when reconstructing any revision.
+    """
+    last = _latest_revision(db, note_id)
+
+    if last is None and previous is not None:
+        # Note predates history: keep its current state as the base snapshot
+        _insert_revision(db, note_id, user_id, 1, "full", previous[0], _pack(previous[1] or ""))
+        last = 1
+
+    revision = (last or 0) + 1
+    full = _pack(content or "")
+
+    if previous is None or (revision - 1) % snapshot_every == 0:
+        kind, payload = "full", full
+    else:
+        delta = _pack(make_delta(previous[1], content))
+        kind, payload = ("delta", delta) if len(delta) < len(full) else ("full", full)
+
+    _insert_revision(db, note_id, user_id, revision, kind, title, payload)
+    return revision
+
+
+def _reconstruct(db, note_id, revision):
+    """Return (title, content, created_at) of a revision, or None."""
+    base = db.execute(
+        """
+        SELECT MAX(revision) AS rev FROM note_revisions
+        WHERE note_id = ? AND revision <= ? AND kind = 'full'
+        """,
+        (note_id, revision),
+    ).fetchone()["rev"]
+
+    if base is None:
+        return None
+
+    rows = db.execute(
+        """
+        SELECT revision, kind, title, data, created_at FROM note_revisions
+        WHERE note_id = ? AND revision BETWEEN ? AND ?
+        ORDER BY revision ASC
+        """,
+        (note_id, base, revision),
+    ).fetchall()
+
+    if not rows or rows[-1]["revision"] != revision:
+        return None
+
+    content = None
+    for row in rows:
+        data = _unpack(row["data"])
+        content = data if row["kind"] == "full" else apply_delta(content, data)
+
+    last = rows[-1]
+    return last["title"], content, last["created_at"]
+
+
+# ============================================================
+# READ API (request connection)
+# ============================================================
+
+def get_revisions(note_id, user_id):
+    """List revisions of a note, newest first, without their content."""
+    db = get_db()
+    return db.execute(
+        """
+        SELECT revision, kind, title, LENGTH(data) AS size, created_at
+        FROM note_revisions
+        WHERE note_id = ? AND user_id = ?
+        ORDER BY revision DESC
+        """,
+        (note_id, user_id),
+    ).fetchall()
+
+
+def get_revision(note_id, user_id, revision):
+    """Return a reconstructed revision as a dict, or None."""
+    db = get_db()
+    owner = db.execute(
+        "SELECT 1 FROM note_revisions WHERE note_id = ? AND user_id = ? LIMIT 1",
+        (note_id, user_id),
+    ).fetchone()
+    if not owner:
+        return None
+
+    result = _reconstruct(db, note_id, revision)
+    if result is None:
+        return None
+
+    title, content, created_at = result
+    return {
+        "revision": revision,
+        "title": title,
+        "content": content,
+        "created_at": created_at,
+    }
+
+
+# ============================================================
+# RETENTION POLICY
+# ============================================================
+
+def prune_revisions(keep_days=90, keep_min=10):
+    """
+    Delete revisions older than `keep_days`, always keeping the newest
+    `keep_min` per note. The oldest surviving revision is rewritten as a
+    full snapshot so the remaining chain can still be reconstructed.
+    Returns the number of revisions deleted.
+    """
+    def op(db):
+        notes = db.execute(
+            "SELECT DISTINCT note_id FROM note_revisions"
+        ).fetchall()
+
+        deleted = 0
+        for row in notes:
+            note_id = row["note_id"]
+
+            # First revision to keep: newer than the cutoff, or within the newest keep_min
+            keep_from = db.execute(
+                """
+                SELECT MIN(revision) AS rev FROM (
+                    SELECT revision FROM note_revisions
+                    WHERE note_id = ? AND created_at >= datetime('now', ?)
+                    UNION
+                    SELECT revision FROM (
+                        SELECT revision FROM note_revisions
+                        WHERE note_id = ?
+                        ORDER BY revision DESC LIMIT ?
+                    )
+                )
+                """,
+                (note_id, f"-{int(keep_days)} days", note_id, max(1, int(keep_min))),
+            ).fetchone()["rev"]
+
+            if keep_from is None:
+                continue
+
+            first = db.execute(
+                "SELECT kind FROM note_revisions WHERE note_id = ? AND revision = ?",
+                (note_id, keep_from),
+            ).fetchone()
+
+            if first is not None and first["kind"] == "delta":
+                _, content, _ = _reconstruct(db, note_id, keep_from)
+                db.execute(
+                    """
+                    UPDATE note_revisions SET kind = 'full', data = ?
+                    WHERE note_id = ? AND revision = ?
+                    """,
+                    (_pack(content), note_id, keep_from),
+                )
+
+            cur = db.execute(
+                "DELETE FROM note_revisions WHERE note_id = ? AND revision < ?",
+                (note_id, keep_from),
+            )
+            deleted += cur.rowcount
+
+        return deleted
+
+    return get_writer().execute(op)
+
+
+__all__ = [
+    "make_delta",
+    "apply_delta",
+    "record_revision",
+    "get_revisions",
+    "get_revision",
+    "prune_revisions",
+]
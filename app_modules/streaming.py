@@ -0,0 +1,39 @@
+# app_modules/streaming.py
+
+from markupsafe import Markup
+
+# Templates call {{ stream_flush() }} where the output so far should be
+# sent to the client (e.g. before a slow DB fetch). Outside streaming it
+# renders as a harmless HTML comment.
+FLUSH_MARKER = "<!--flush-->"
+
+
+def stream_flush():
+    """Jinja helper: mark a point where a streamed response is flushed."""
+    return Markup(FLUSH_MARKER)
+
+
+def flush_at_markers(pieces):
+    """
+    Regroup the many small strings of a streamed template into chunks
+    that end at each flush marker, so the client receives the page in
+    a few meaningful pieces instead of one write per template node.
+    """
+    buffer = []
+    for piece in pieces:
+        if FLUSH_MARKER in piece:
+            buffer.append(piece.replace(FLUSH_MARKER, ""))
+            yield "".join(buffer)
+            buffer = []
+        else:
+            buffer.append(piece)
+
+    if buffer:
+        yield "".join(buffer)
+
+
+__all__ = [
+    "FLUSH_MARKER",
+    "stream_flush",
+    "flush_at_markers",
+]
@@ -0,0 +1,193 @@
+# app_modules/suggest.py
+
+import time
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+
+from flask import current_app
+
+
+# ============================================================
+# PER-USER PREFIX INDEX
+# ============================================================
+
+class PrefixIndex:
+    """
+    Sorted array of lowercased titles / category names for one user.
+    Prefix lookups are a single bisect followed by a short linear scan.
+    """
+
+    def __init__(self):
+        self._entries = []  # sorted list of (key, kind, id, text)
+        self._by_ref = {}   # (kind, id) -> entry, used for updates/removals
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, kind, ref_id, text):
+        """Insert or replace the entry for (kind, ref_id)."""
+        self.remove(kind, ref_id)
+
+        text = (text or "").strip()
+        if not text:
+            return
+
+        entry = (text.lower(), kind, ref_id, text)
+        insort(self._entries, entry)
+        self._by_ref[(kind, ref_id)] = entry
+
+    def remove(self, kind, ref_id):
+        entry = self._by_ref.pop((kind, ref_id), None)
+        if entry is None:
+            return
+
+        pos = bisect_left(self._entries, entry)
+        if pos < len(self._entries) and self._entries[pos] == entry:
+            del self._entries[pos]
+
+    def search(self, prefix, limit=10):
+        """Return up to `limit` entries whose text starts with `prefix`."""
+        prefix = prefix.lower()
+        pos = bisect_left(self._entries, (prefix,))
+        results = []
+
+        while pos < len(self._entries) and len(results) < limit:
+            key, kind, ref_id, text = self._entries[pos]
+            if not key.startswith(prefix):
+                break
+            results.append({"text": text, "type": kind, "id": ref_id})
+            pos += 1
+
+        return results
+
+
+# ============================================================
+# LRU CACHE OF USER INDEXES
+# ============================================================
+
+class SuggestIndexCache:
+    """
+    Holds one PrefixIndex per active user.
+
+    Indexes are built lazily on the first suggestion request, kept up to
+    date by the model write paths, and evicted least-recently-used once
+    more than `max_users` are loaded or after `idle_seconds` without use.
+    """
+
+    def __init__(self, max_users=256, idle_seconds=600):
+        self.max_users = max_users
+        self.idle_seconds = idle_seconds
+
+        self._indexes = OrderedDict()  # user_id -> (index, last_used)
+        self._generations = {}         # user_id -> writes seen, only while building
+        self._builders = Counter()     # user_id -> builds in progress
+        self._lock = threading.Lock()
+
+    def suggest(self, user_id, prefix, loader, limit=10):
+        """
+        Return suggestions for `prefix`.
+        `loader(user_id)` returns an iterable of (kind, id, text) and is
+        only called when the user's index is not loaded yet.
+        """
+        user_id = str(user_id)
+        index = self._get(user_id)
+
+        if index is None:
+            index = self._build(user_id, loader)
+
+        with self._lock:
+            return index.search(prefix, limit)
+
+    # -----------------------------------------------------------
+    # WRITE-PATH HOOKS (called after the write has committed)
+    # -----------------------------------------------------------
+
+    def add(self, user_id, kind, ref_id, text):
+        self._apply(user_id, lambda index: index.add(kind, ref_id, text))
+
+    def remove(self, user_id, kind, ref_id):
+        self._apply(user_id, lambda index: index.remove(kind, ref_id))
+
+    def evict(self, user_id):
+        with self._lock:
+            self._indexes.pop(str(user_id), None)
+
+    # -----------------------------------------------------------
+    # INTERNALS
+    # -----------------------------------------------------------
+
+    def _apply(self, user_id, change):
+        user_id = str(user_id)
+        with self._lock:
+            # Writes only matter to a loaded index or one being built;
+            # nothing is tracked for anyone else
+            if user_id in self._generations:
+                self._generations[user_id] += 1
+            cached = self._indexes.get(user_id)
+            if cached is not None:
+                change(cached[0])
+
+    def _get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            cached = self._indexes.get(user_id)
+            if cached is None:
+                return None
+            self._indexes[user_id] = (cached[0], now)
+            self._indexes.move_to_end(user_id)
+            return cached[0]
+
+    def _build(self, user_id, loader):
+        # A write landing between the DB read and installing the index
+        # would be lost, so rebuild if the user's generation moved.
+        with self._lock:
+            self._builders[user_id] += 1
+            self._generations.setdefault(user_id, 0)
+
+        try:
+            for _ in range(3):
+                with self._lock:
+                    generation = self._generations[user_id]
+
+                index = PrefixIndex()
+                for kind, ref_id, text in loader(user_id):
+                    index.add(kind, ref_id, text)
+
+                with self._lock:
+                    if self._generations[user_id] == generation:
+                        break
+
+            with self._lock:
+                self._indexes[user_id] = (index, time.monotonic())
+                self._indexes.move_to_end(user_id)
+                while len(self._indexes) > self.max_users:
+                    self._indexes.popitem(last=False)
+        finally:
+            with self._lock:
+                self._builders[user_id] -= 1
+                if not self._builders[user_id]:
+                    del self._builders[user_id]
+                    del self._generations[user_id]
+
+        return index
+
+    def _evict_idle(self, now):
+        while self._indexes:
+            _, (_, last_used) = next(iter(self._indexes.items()))
+            if now - last_used <= self.idle_seconds:
+                break
+            self._indexes.popitem(last=False)
+
+
+def get_suggest_index():
+    """Return the app-wide SuggestIndexCache."""
+    return current_app.extensions["suggest"]
+
+
+__all__ = [
+    "PrefixIndex",
+    "SuggestIndexCache",
+    "get_suggest_index",
+]
@@ -1,7 +1,7 @@
 # app_modules/sync.py
 
 from datetime import datetime
-from .models import insert_synced_note
+from .models import insert_synced_notes
 
 
 def normalize_timestamp(ts):
@@ -39,12 +39,14 @@ def sync_local_to_cloud(user_id, local_notes):
     Steps:
       1. Validate each note object.
       2. Normalize timestamps.
-      3. Insert into DB unless duplicate.
+      3. Insert into DB unless duplicate (one write for the whole batch).
       4. (Optional) Extend logic for merging content if needed.
     """
     if not local_notes or not isinstance(local_notes, list):
         return
 
+    pending = []
+
     for note in local_notes:
         if not validate_local_note(note):
             continue  # Skip malformed notes
@@ -60,10 +62,11 @@ def sync_local_to_cloud(user_id, local_notes):
         created_at = normalize_timestamp(created_at)
 
         # Categories are local-only for guests → ignore on sync
-        insert_synced_note(
-            user_id=user_id,
-            title=title,
-            content=content,
-            category=None,
-            created_at=created_at,
-        )
+        pending.append({
+            "title": title,
+            "content": content,
+            "created_at": created_at,
+        })
+
+    if pending:
+        insert_synced_notes(user_id, pending)
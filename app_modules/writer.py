@@ -0,0 +1,252 @@
+# app_modules/writer.py
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+
+# Sentinel placed on the queue to stop the writer thread
+_STOP = object()
+
+
+def enable_wal(db):
+    """
+    Put a connection's database in WAL mode, so open read cursors never
+    block the writer's COMMIT (and the writer never blocks readers).
+    The mode is stored in the file; once set this is a cheap no-op.
+
+    auto_vacuum is set first: on a new database it can no longer be
+    changed once the switch to WAL has written the header.
+    """
+    db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    db.execute("PRAGMA journal_mode = WAL")
+
+
+class WriteTimeout(FutureTimeout):
+    """
+    Raised by WriteQueue.execute() when a write was still queued after
+    `result_timeout`. The write has been cancelled: nothing was written,
+    so it is safe to retry.
+    """
+
+
+class WriteQueue:
+    """
+    Single writer thread that owns the only write connection to SQLite.
+
+    Mutations are submitted as callables taking a connection: `fn(db)`.
+    Writes arriving within `max_latency` seconds of the first one are
+    committed together in one transaction (group commit), up to
+    `max_batch` writes per commit. Each write runs inside its own
+    SAVEPOINT, so a failing write only rolls back itself and its caller
+    receives the exception through the returned Future.
+
+    Write callables must NOT call `db.commit()` themselves.
+
+    `stats` counts batches, writes, lock waits (BEGIN IMMEDIATE had to
+    wait for another connection), lock errors, failed batches and writes
+    cancelled by a timeout.
+
+    `execute()` gives up on a write still queued after `result_timeout`
+    seconds (cancelling it, see WriteTimeout), so a stuck writer surfaces
+    as an error instead of hanging every request.
+    """
+
+    # Acquiring the write lock slower than this counts as a lock wait
+    LOCK_WAIT_THRESHOLD = 0.005
+
+    def __init__(self, database, max_batch=64, max_latency=0.002, timeout=5.0,
+                 result_timeout=30.0):
+        self.database = database
+        self.max_batch = max(1, int(max_batch))
+        self.max_latency = max(0.0, float(max_latency))
+        self.timeout = timeout
+        self.result_timeout = result_timeout
+        self.stats = Counter()
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # -----------------------------------------------------------
+    # PUBLIC API
+    # -----------------------------------------------------------
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue `fn(db, *args, **kwargs)` and return a Future for its result."""
+        if self._closed:
+            raise RuntimeError("WriteQueue is closed.")
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def execute(self, fn, *args, **kwargs):
+        """
+        Queue a write and block until it has been committed.
+
+        If it has not started after `result_timeout` seconds it is
+        cancelled and WriteTimeout is raised. A write that already runs
+        inside a batch can no longer be cancelled, so its real outcome
+        (decided at that batch's COMMIT) is waited for instead: callers
+        never see a failure for a write that went through.
+        """
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=self.result_timeout)
+        except FutureTimeout:
+            if future.cancel():
+                self.stats["timeouts"] += 1
+                raise WriteTimeout(
+                    f"Write not applied: still queued after {self.result_timeout}s."
+                ) from None
+            return future.result()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    # -----------------------------------------------------------
+    # WRITER THREAD
+    # -----------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="sqlite-writer",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _connect(self):
+        db = sqlite3.connect(
+            self.database,
+            timeout=self.timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,  # transactions are managed explicitly
+        )
+        db.row_factory = sqlite3.Row
+        enable_wal(db)
+        return db
+
+    def _run(self):
+        db = self._connect()
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                batch = [item]
+                deadline = time.monotonic() + self.max_latency
+
+                # Collect everything that arrives inside the latency window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        if remaining > 0:
+                            item = self._queue.get(timeout=remaining)
+                        else:
+                            item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                self._commit_batch(db, batch)
+        finally:
+            db.close()
+
+    def _commit_batch(self, db, batch):
+        """Run a batch of writes in one transaction and resolve their futures."""
+        self.stats["batches"] += 1
+        self.stats["writes"] += len(batch)
+
+        started = time.monotonic()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as exc:
+            self.stats["lock_errors"] += 1
+            for future, _, _, _ in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+            return
+
+        waited = time.monotonic() - started
+        if waited > self.LOCK_WAIT_THRESHOLD:
+            self.stats["lock_waits"] += 1
+            self.stats["lock_wait_ms"] += int(waited * 1000)
+
+        outcomes = []
+        try:
+            for future, fn, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue  # Cancelled before it ran
+
+                db.execute("SAVEPOINT write_op")
+                try:
+                    value = fn(db, *args, **kwargs)
+                except BaseException as exc:
+                    db.execute("ROLLBACK TO write_op")
+                    db.execute("RELEASE write_op")
+                    outcomes.append((future, False, exc))
+                else:
+                    db.execute("RELEASE write_op")
+                    outcomes.append((future, True, value))
+
+            db.execute("COMMIT")
+        except BaseException as exc:
+            # e.g. SQLITE_FULL/IOERR: SQLite may already have rolled the
+            # whole transaction back, making ROLLBACK TO/COMMIT fail too.
+            # Fail every write in the batch and keep the thread alive.
+            self.stats["failed_batches"] += 1
+            self._rollback(db)
+            for future, _, _, _ in batch:
+                if future.done():
+                    continue
+                if future.running() or future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+            return
+
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    @staticmethod
+    def _rollback(db):
+        try:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+        except sqlite3.Error:
+            pass
+
+
+__all__ = [
+    "enable_wal",
+    "WriteTimeout",
+    "WriteQueue",
+]
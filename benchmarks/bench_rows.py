@@ -0,0 +1,151 @@
+"""
+Row materialization benchmark: sqlite3.Row from SELECT * / n.* (the
+previous behaviour) vs. the projected Note/Category row factories and
+the tuple-based category JSON path in app_modules.models.
+
+    python benchmarks/bench_rows.py [--rows 10000] [--repeat 10]
+
+Runs against an in-memory database with the app's schema; prints the
+best time of --repeat runs per case and the memory held by one result
+list.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_modules.models import (  # noqa: E402
+    NOTE_CARD_COLUMNS,
+    _note_row,
+    _category_row,
+    create_tables,
+)
+from app_modules.rendering import content_hash  # noqa: E402
+
+
+CARD_JOIN = """
+    FROM notes n
+    LEFT JOIN categories c ON n.category_id = c.id
+    WHERE n.user_id = 1
+    ORDER BY n.pinned DESC, n.updated_at DESC
+"""
+
+
+def build_db(rows):
+    db = sqlite3.connect(":memory:")
+    db.row_factory = sqlite3.Row
+    create_tables(db)
+
+    content = "lorem ipsum dolor sit amet " * 60  # ~1.6 KB, a typical note
+    db.executemany(
+        "INSERT INTO categories (user_id, name) VALUES (1, ?)",
+        [(f"category {i}",) for i in range(rows)],
+    )
+    db.executemany(
+        """
+        INSERT INTO notes (user_id, title, content, content_hash, category_id, pinned, created_at, updated_at)
+        VALUES (1, ?, ?, ?, ?, 0, '2026-01-01', '2026-01-01')
+        """,
+        [(f"note {i}", content, content_hash(content), i % 50 + 1) for i in range(rows)],
+    )
+    db.commit()
+    return db
+
+
+def query(db, sql, row_factory):
+    cursor = db.cursor()
+    cursor.row_factory = row_factory
+    return cursor.execute(sql).fetchall()
+
+
+# ------------------------------------------------------------
+# CASES: (name, before, after)
+# ------------------------------------------------------------
+
+def cases(db):
+    def json_before():
+        rows = db.execute("SELECT * FROM categories WHERE user_id = 1 ORDER BY name ASC").fetchall()
+        return json.dumps([dict(row) for row in rows])
+
+    def json_after():
+        rows = query(db, "SELECT id, name FROM categories WHERE user_id = 1 ORDER BY name ASC", None)
+        return json.dumps([{"id": id_, "name": name} for id_, name in rows], separators=(",", ":"))
+
+    def categories_before():
+        rows = db.execute("SELECT * FROM categories WHERE user_id = 1 ORDER BY name ASC").fetchall()
+        return [row["name"] for row in rows]
+
+    def categories_after():
+        rows = query(db, "SELECT id, name FROM categories WHERE user_id = 1 ORDER BY name ASC", _category_row)
+        return [c.name for c in rows]
+
+    # Cards touch the fields the dashboard template reads
+    def cards_before():
+        rows = db.execute(f"SELECT n.*, c.name AS category_name {CARD_JOIN}").fetchall()
+        return sum(
+            len(r["title"]) + len(r["content"][:200]) + bool(r["pinned"]) + len(r["category_name"] or "")
+            for r in rows
+        )
+
+    def cards_after():
+        rows = query(db, f"SELECT {NOTE_CARD_COLUMNS} {CARD_JOIN}", _note_row)
+        return sum(
+            len(n.title) + len(n.content[:200]) + bool(n.pinned) + len(n.category_name or "")
+            for n in rows
+        )
+
+    return [
+        ("category JSON", json_before, json_after),
+        ("category list", categories_before, categories_after),
+        ("dashboard cards", cards_before, cards_after),
+    ]
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def held_mb(fn):
+    tracemalloc.start()
+    result = fn()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return held / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench_rows.py")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    db = build_db(args.rows)
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'case':<18} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name, before, after in cases(db):
+        b, a = best_ms(before, args.repeat), best_ms(after, args.repeat)
+        print(f"{name:<18} {b:>10.1f} {a:>10.1f} {b / a:>7.2f}x")
+
+    def rows_before():
+        return db.execute(f"SELECT n.*, c.name AS category_name {CARD_JOIN}").fetchall()
+
+    def rows_after():
+        return query(db, f"SELECT {NOTE_CARD_COLUMNS} {CARD_JOIN}", _note_row)
+
+    print(f"memory held by card rows: {held_mb(rows_before):.1f} MB -> {held_mb(rows_after):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,82 @@ class Config:
 
     DATABASE = os.path.join(INSTANCE_DIR, "notes.db")
 
+    # Group commit: writes arriving within this window share one transaction
+    WRITER_MAX_BATCH = int(os.environ.get("WRITER_MAX_BATCH", 64))
+    WRITER_MAX_LATENCY_MS = float(os.environ.get("WRITER_MAX_LATENCY_MS", 2))
+    WRITER_RESULT_TIMEOUT = 30  # seconds a request waits for its write
+
+    # Typeahead: per-user prefix indexes kept in memory (LRU)
+    SUGGEST_MAX_USERS = 256
+    SUGGEST_IDLE_SECONDS = 600
+    SUGGEST_LIMIT = 10
+
+    # Related notes: per-user TF-IDF corpora kept in memory (LRU)
+    RELATED_MAX_USERS = 64
+    RELATED_IDLE_SECONDS = 600
+    RELATED_TOP_K = 5
+
+    # Note history: full snapshot every N revisions, deltas in between
+    REVISION_SNAPSHOT_INTERVAL = 20
+    REVISION_KEEP_DAYS = 90
+    REVISION_KEEP_MIN = 10
+
+    # Rate limiting: one token bucket per user (or IP when anonymous),
+    # refilled at RATE tokens/s up to BURST; each endpoint costs tokens.
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_RATE = 2.0
+    RATE_LIMIT_BURST = 30
+    RATE_LIMIT_COSTS = {
+        "notes.sync": 10,
+        "notes.search": 3,                     # dashboard with ?q=
+        "category_api.api_get_categories": 1,
+        "auth.login": 5,                       # POST only, keyed by IP
+    }
+
+    # Online backups: copied in small page steps, newest BACKUP_KEEP kept
+    BACKUP_DIR = os.path.join(INSTANCE_DIR, "backups")
+    BACKUP_KEEP = 7
+    BACKUP_PAGES_PER_STEP = 64
+    BACKUP_STEP_PAUSE = 0.01
+    BACKUP_INTERVAL_SECONDS = int(os.environ.get("BACKUP_INTERVAL_SECONDS", 0))
+
+    # Background jobs: pool size and concurrent jobs allowed per user
+    JOBS_MAX_WORKERS = 2
+    JOBS_PER_USER = 1
+
+    # Syncs larger than this run as a background job, in chunks
+    SYNC_INLINE_LIMIT = 200
+    SYNC_CHUNK_SIZE = 100
+
+    # `app.py maintain`: free pages reclaimed per incremental_vacuum step
+    MAINTAIN_PAGES_PER_STEP = 256
+    MAINTAIN_STEP_PAUSE = 0.05
+
+    # Response compression (brotli used when installed and accepted)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 500  # bytes
+    COMPRESS_LEVEL = 6
+    STATIC_MAX_AGE = 60 * 60  # Cache-Control max-age for /static files
+
+    # Attachments: stored once per SHA-256 under instance/attachments
+    ATTACHMENTS_DIR = os.path.join(INSTANCE_DIR, "attachments")
+    ATTACHMENT_MAX_SIZE = 25 * 1024 * 1024
+    MAX_CONTENT_LENGTH = 30 * 1024 * 1024
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "0") == "1"
+
+    # /debug/profile: allowed for these users, or with X-Profile-Token
+    ADMIN_USERNAMES = [u for u in os.environ.get("ADMIN_USERNAMES", "").split(",") if u]
+    PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+    PROFILE_MAX_SECONDS = 60
+    PROFILE_INTERVAL = 0.005
+
+    # Dashboard: stream the page, flushing every N note cards
+    DASHBOARD_STREAMING = True
+    DASHBOARD_STREAM_CHUNK = 50
+
+    # Rendered note Markdown kept in memory, keyed by content hash
+    MARKDOWN_CACHE_SIZE = 4096
+
     DEBUG = True
     REMEMBER_COOKIE_DURATION = 60 * 60 * 24 * 7
 
@@ -19,6 +19,8 @@ function loadNotes() {
 // Save notes to localStorage
 function saveNotes(notes) {
     localStorage.setItem(LS_KEY, JSON.stringify(notes));
+    // Picked up by sync.js on the dashboard after the next login
+    localStorage.setItem("sync_pending", "1");
 }
 
 // Generate a unique ID for each note
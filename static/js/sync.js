@@ -2,88 +2,115 @@
 // Sync Local Notes → Cloud After Login
 // ======================================================
 
-const LS_KEY = "guest_notes";
-const SYNC_FLAG = "sync_pending";
-
-// ------------------------------------------------------
-// Detect if user arrived on dashboard right after login
-// We set SYNC_FLAG before redirecting to login (optional)
-// ------------------------------------------------------
-
-function shouldSync() {
-    return localStorage.getItem(SYNC_FLAG) === "1";
-}
-
-// ------------------------------------------------------
-// Get all guest notes from localStorage
-// ------------------------------------------------------
-
-function getLocalNotes() {
-    const raw = localStorage.getItem(LS_KEY);
-    try {
-        return raw ? JSON.parse(raw) : [];
-    } catch (err) {
-        console.error("Failed to parse local notes for sync", err);
-        return [];
+// Wrapped in a function scope: loaded next to main.js, which declares
+// its own top-level LS_KEY, and global `const`s may not be redeclared.
+(function () {
+    const LS_KEY = "guest_notes";
+    const SYNC_FLAG = "sync_pending";
+
+    // ------------------------------------------------------
+    // Detect if user arrived on dashboard right after login
+    // We set SYNC_FLAG before redirecting to login (optional)
+    // ------------------------------------------------------
+
+    function shouldSync() {
+        return localStorage.getItem(SYNC_FLAG) === "1";
     }
-}
-
-// ------------------------------------------------------
-// Send notes to the backend for merging
-// ------------------------------------------------------
-
-async function sendNotesToServer(notes) {
-    try {
-        const response = await fetch("/notes/sync", {
-            method: "POST",
-            headers: {
-                "Content-Type": "application/json"
-            },
-            body: JSON.stringify({ notes: notes })
-        });
-
-        const data = await response.json();
-        return data.status === "success";
-
-    } catch (err) {
-        console.error("Sync request failed", err);
-        return false;
-    }
-}
 
-// ------------------------------------------------------
-// Main Sync Logic
-// ------------------------------------------------------
+    // ------------------------------------------------------
+    // Get all guest notes from localStorage
+    // ------------------------------------------------------
+
+    function getLocalNotes() {
+        const raw = localStorage.getItem(LS_KEY);
+        try {
+            return raw ? JSON.parse(raw) : [];
+        } catch (err) {
+            console.error("Failed to parse local notes for sync", err);
+            return [];
+        }
+    }
 
-async function syncNotes() {
-    const notes = getLocalNotes();
-    if (!notes.length) {
-        localStorage.removeItem(SYNC_FLAG);
-        return; // nothing to sync
+    // ------------------------------------------------------
+    // Send notes to the backend for merging
+    // ------------------------------------------------------
+
+    async function sendNotesToServer(notes) {
+        try {
+            const response = await fetch("/notes/sync", {
+                method: "POST",
+                headers: {
+                    "Content-Type": "application/json"
+                },
+                body: JSON.stringify({ notes: notes })
+            });
+
+            const data = await response.json();
+
+            // Large syncs are queued as a background job
+            if (data.status === "queued") {
+                return await waitForJob(data.job_id);
+            }
+
+            return data.status === "success";
+
+        } catch (err) {
+            console.error("Sync request failed", err);
+            return false;
+        }
     }
 
-    const ok = await sendNotesToServer(notes);
+    // ------------------------------------------------------
+    // Poll a background job until it finishes
+    // ------------------------------------------------------
+
+    async function waitForJob(jobId) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+
+            const response = await fetch(`/jobs/${jobId}`);
+            if (!response.ok) return false;
+
+            const job = await response.json();
+            if (job.status === "done") return true;
+            if (job.status === "failed" || job.status === "cancelled") return false;
+        }
+    }
 
-    if (ok) {
-        console.log("Local notes successfully synced to cloud.");
-        localStorage.removeItem(LS_KEY);      // Clear guest notes
-        localStorage.removeItem(SYNC_FLAG);   // Stop future syncs
-    } else {
-        console.warn("Note sync failed. Will try again on next login.");
+    // ------------------------------------------------------
+    // Main Sync Logic
+    // ------------------------------------------------------
+
+    async function syncNotes() {
+        const notes = getLocalNotes();
+        if (!notes.length) {
+            localStorage.removeItem(SYNC_FLAG);
+            return; // nothing to sync
+        }
+
+        const ok = await sendNotesToServer(notes);
+
+        if (ok) {
+            console.log("Local notes successfully synced to cloud.");
+            localStorage.removeItem(LS_KEY);      // Clear guest notes
+            localStorage.removeItem(SYNC_FLAG);   // Stop future syncs
+        } else {
+            console.warn("Note sync failed. Will try again on next login.");
+        }
     }
-}
 
-// ------------------------------------------------------
-// Initialize: run only on logged-in pages
-// ------------------------------------------------------
+    // ------------------------------------------------------
+    // Initialize: run only on logged-in pages
+    // ------------------------------------------------------
 
-function initSync() {
-    const dashboardEl = document.querySelector(".dashboard-container");
+    function initSync() {
+        const dashboardEl = document.querySelector(".dashboard-container");
 
-    // Only run sync if user is logged-in and on dashboard
-    if (dashboardEl && shouldSync()) {
-        syncNotes();
+        // Only run sync if user is logged-in and on dashboard
+        if (dashboardEl && shouldSync()) {
+            syncNotes();
+        }
     }
-}
 
-document.addEventListener("DOMContentLoaded", initSync);
+    document.addEventListener("DOMContentLoaded", initSync);
+})();
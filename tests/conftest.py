@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app the same way app.py does, from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_modules import create_app, init_db  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    Build an app on a fresh database under tmp_path. Keyword arguments
+    override the test config (rate limiting is off unless re-enabled).
+    """
+    apps = []
+
+    def make(**config):
+        app = create_app(test_config={
+            "TESTING": True,
+            "DATABASE": str(tmp_path / "t.db"),
+            "ATTACHMENTS_DIR": str(tmp_path / "attachments"),
+            "RATE_LIMIT_ENABLED": False,
+            **config,
+        })
+        with app.app_context():
+            init_db()
+        apps.append(app)
+        return app
+
+    yield make
+
+    for app in apps:
+        app.extensions["writer"].close()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    """Test client logged in as user "u"."""
+    client = app.test_client()
+    client.post("/auth/register", data={"username": "u", "password": "p", "confirm_password": "p"})
+    client.post("/auth/login", data={"username": "u", "password": "p"})
+    return client
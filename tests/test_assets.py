@@ -0,0 +1,132 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from app_modules.assets import BUNDLES, AssetManifest, build_assets, minify_css, minify_js
+
+
+STATIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+# Every page loads core.js from base.html, plus at most one page bundle
+PAGE_BUNDLES = [name for name in BUNDLES if name.endswith(".js") and name != "core.js"]
+
+TOP_LEVEL_LEXICAL_RE = re.compile(r"^(?:const|let|class)\s+([A-Za-z_$][\w$]*)", re.M)
+
+
+@pytest.fixture
+def static_copy(tmp_path):
+    dest = tmp_path / "static"
+    shutil.copytree(STATIC, dest, ignore=shutil.ignore_patterns("dist"))
+    return str(dest)
+
+
+def _sources(*bundles):
+    return [os.path.join(STATIC, rel) for name in bundles for rel in BUNDLES[name]]
+
+
+def test_build_writes_fingerprinted_bundles_and_manifest(static_copy):
+    manifest = build_assets(static_copy, log=lambda line: None)
+
+    assert set(manifest) == set(BUNDLES)
+    for name, rel in manifest.items():
+        stem, ext = os.path.splitext(name)
+        assert re.fullmatch(rf"dist/{re.escape(stem)}\.[0-9a-f]{{12}}{re.escape(ext)}", rel)
+        assert os.path.isfile(os.path.join(static_copy, rel))
+
+    with open(os.path.join(static_copy, "dist", "manifest.json")) as fh:
+        assert json.load(fh) == manifest
+
+    # Each source file keeps its own scope inside a JS bundle
+    with open(os.path.join(static_copy, manifest["core.js"])) as fh:
+        assert fh.read().count(";(function () {") == len(BUNDLES["core.js"])
+
+
+def test_rebuild_removes_stale_bundles(static_copy):
+    first = build_assets(static_copy, log=lambda line: None)
+    with open(os.path.join(static_copy, "css", "style.css"), "a") as fh:
+        fh.write("\n.added { color: red; }\n")
+
+    second = build_assets(static_copy, log=lambda line: None)
+
+    assert second["app.css"] != first["app.css"]
+    assert second["core.js"] == first["core.js"]
+    assert sorted(os.listdir(os.path.join(static_copy, "dist"))) == sorted(
+        [os.path.basename(rel) for rel in second.values()] + ["manifest.json"]
+    )
+
+
+def test_minifiers_keep_code():
+    assert minify_js("// note\n\n    const a = 1; // kept\n") == "const a = 1; // kept"
+    assert minify_css("/* c */ a  {  color: red ;  }\n") == "a{color:red}"
+
+
+def test_manifest_lookup_and_reload(static_copy):
+    manifest = AssetManifest(static_copy)
+    assert manifest.get("core.js") is None  # not built yet
+
+    built = build_assets(static_copy, log=lambda line: None)
+    assert manifest.get("core.js") == built["core.js"]
+    assert manifest.get("missing.js") is None
+
+    path = os.path.join(static_copy, "dist", "manifest.json")
+    with open(path, "w") as fh:
+        json.dump({"core.js": "dist/core.new.js"}, fh)
+    os.utime(path, (1, 1))  # force an mtime change
+    assert manifest.get("core.js") == "dist/core.new.js"
+
+
+def test_pages_use_source_files_until_built(app, client, static_copy):
+    app.extensions["assets"] = AssetManifest(static_copy)
+
+    page = client.get("/notes/dashboard").get_data(as_text=True)
+    for rel in BUNDLES["core.js"] + BUNDLES["sync.js"]:
+        assert f'src="/static/{rel}"' in page
+
+    built = build_assets(static_copy, log=lambda line: None)
+    page = client.get("/notes/dashboard").get_data(as_text=True)
+    assert f'src="/static/{built["core.js"]}"' in page
+    assert f'src="/static/{built["sync.js"]}"' in page
+    assert 'src="/static/js/' not in page
+
+
+@pytest.mark.parametrize("bundle", PAGE_BUNDLES)
+def test_unbuilt_page_scripts_share_no_top_level_names(bundle):
+    # Unbuilt, every source file is its own <script>: all of them share
+    # one global scope, where a `const`/`let`/`class` can't be redeclared.
+    seen = {}
+    for path in _sources("core.js", bundle):
+        with open(path, encoding="utf-8") as fh:
+            for name in TOP_LEVEL_LEXICAL_RE.findall(fh.read()):
+                assert name not in seen, f"{name} declared in {seen.get(name)} and {path}"
+                seen[name] = path
+
+
+NODE_LOADER = """
+const vm = require("vm"), fs = require("fs");
+const element = new Proxy(function () {}, { get: () => element, apply: () => element });
+const ctx = vm.createContext({ document: element, window: element, localStorage: element, console });
+for (const file of process.argv.slice(1)) {
+    try {
+        new vm.Script(fs.readFileSync(file, "utf8"), { filename: file }).runInContext(ctx);
+    } catch (err) {
+        if (err.name === "SyntaxError") {  // e.g. a redeclared global
+            console.error(err.message);
+            process.exit(1);
+        }
+    }
+}
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+@pytest.mark.parametrize("bundle", PAGE_BUNDLES)
+def test_unbuilt_page_scripts_load_in_one_scope(bundle):
+    result = subprocess.run(
+        ["node", "-e", NODE_LOADER, *_sources("core.js", bundle)],
+        capture_output=True, text=True, timeout=30,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,83 @@
+import io
+import os
+import sqlite3
+
+import pytest
+
+
+def _post(client, note_id, data, filename="a.txt", mimetype="text/plain"):
+    return client.post(
+        f"/notes/{note_id}/attachments",
+        data={"file": (io.BytesIO(data), filename, mimetype)},
+        content_type="multipart/form-data",
+    )
+
+
+def _upload(client, note_id, data=b"same bytes", **kwargs):
+    r = _post(client, note_id, data, **kwargs)
+    assert r.status_code == 200, r.data
+    return r.json["id"]
+
+
+def _stored_files(app):
+    root = app.config["ATTACHMENTS_DIR"]
+    return [
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+    ]
+
+
+def test_shared_file_removed_with_last_link(app, client):
+    client.post("/notes/create", data={"title": "one", "content": "x"})
+    client.post("/notes/create", data={"title": "two", "content": "y"})
+
+    first = _upload(client, 1)
+    _upload(client, 2)
+
+    with app.app_context():
+        from app_modules.attachments import get_attachment, get_attachment_store
+        path = get_attachment_store().path(get_attachment(first, 1)["hash"])
+    assert os.path.exists(path)
+
+    client.delete(f"/notes/attachments/{first}")
+    assert os.path.exists(path)  # still linked from note 2
+
+    client.post("/notes/delete/2")
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("filename, mimetype, inline", [
+    ("x.html", "text/html", False),
+    ("x.svg", "image/svg+xml", False),
+    ("x.txt", "text/plain", False),
+    ("x.png", "image/png", True),
+])
+def test_only_images_are_served_inline(client, filename, mimetype, inline):
+    client.post("/notes/create", data={"title": "n", "content": "x"})
+    attachment_id = _upload(client, 1, b"<script>alert(1)</script>",
+                            filename=filename, mimetype=mimetype)
+
+    r = client.get(f"/notes/attachments/{attachment_id}")
+    assert r.status_code == 200
+    assert r.headers["X-Content-Type-Options"] == "nosniff"
+    assert r.headers.get("Content-Disposition", "").startswith("attachment") != inline
+
+
+def test_failed_insert_leaves_no_file(app, client):
+    client.post("/notes/create", data={"title": "n", "content": "x"})
+    db = sqlite3.connect(app.config["DATABASE"])
+    db.execute(
+        "CREATE TRIGGER fail_attach BEFORE INSERT ON note_attachments "
+        "BEGIN SELECT RAISE(ABORT, 'disk full'); END"
+    )
+    db.commit()
+    db.close()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        _post(client, 1, b"never linked")
+    assert _stored_files(app) == []
+
+
+def test_upload_to_missing_note_is_404(client):
+    assert _post(client, 99, b"x").status_code == 404
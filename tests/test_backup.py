@@ -0,0 +1,55 @@
+import os
+import sqlite3
+
+import pytest
+
+from app_modules.backup import backup_database
+
+
+def _make_db(path):
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE t (v TEXT)")
+    db.executemany("INSERT INTO t VALUES (?)", [("x" * 100,)] * 500)
+    db.commit()
+    db.close()
+
+
+def test_missing_backup_dir_is_created_and_rotated(tmp_path):
+    src = str(tmp_path / "notes.db")
+    _make_db(src)
+    dest = os.path.join(str(tmp_path / "instance" / "backups"), "")  # not created yet
+
+    paths = [backup_database(src, dest, pause=0, keep=2) for _ in range(3)]
+
+    assert os.path.isdir(dest)
+    assert len(set(paths)) == 3
+    assert sorted(os.listdir(dest)) == sorted(os.path.basename(p) for p in paths[1:])
+    count = sqlite3.connect(paths[-1]).execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    assert count == 500
+
+
+@pytest.mark.parametrize("name", ["copy.db", "backup.sqlite", "snapshot"])
+def test_non_directory_dest_is_a_file_path(tmp_path, name):
+    src = str(tmp_path / "notes.db")
+    _make_db(src)
+    dest = str(tmp_path / "out" / name)
+
+    assert backup_database(src, dest, pause=0) == dest
+    assert os.path.isfile(dest)
+    # An existing file is replaced, not turned into a directory
+    assert backup_database(src, dest, pause=0) == dest
+    assert os.path.isfile(dest)
+
+
+def test_rotation_leaves_other_files_alone(tmp_path):
+    src = str(tmp_path / "notes.db")
+    _make_db(src)
+    dest = tmp_path / "backups"
+    dest.mkdir()
+    others = ["notes-keep-me.db", "notes-20200101-000000.db", "other.db"]
+    for name in others:
+        (dest / name).write_bytes(b"not a snapshot")
+
+    paths = [backup_database(src, str(dest), pause=0, keep=1) for _ in range(3)]
+
+    assert sorted(os.listdir(dest)) == sorted(others + [os.path.basename(paths[-1])])
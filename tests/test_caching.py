@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def client(client):
+    client.post("/notes/create", data={"title": "secret", "content": "private"})
+    return client
+
+
+def test_static_files_are_cacheable(client):
+    r = client.get("/static/css/style.css")
+    assert r.status_code == 200
+    assert r.cache_control.public
+    assert r.cache_control.max_age == 3600
+
+
+@pytest.mark.parametrize("fmt", ["txt", "md", "html"])
+def test_note_downloads_are_not_publicly_cached(client, fmt):
+    r = client.get(f"/notes/notes/download/1?format={fmt}")
+    assert r.status_code == 200
+    assert not r.cache_control.public
+    assert r.cache_control.max_age is None
+    assert "Expires" not in r.headers
@@ -0,0 +1,74 @@
+import re
+
+import pytest
+
+
+NOTE_ID_RE = re.compile(r'class="pin-btn"\s+data-note-id="(\d+)"')
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(DASHBOARD_STREAM_CHUNK=5)
+    app.extensions["writer"].timeout = 1  # a commit blocked by a reader fails fast
+    return app
+
+
+@pytest.fixture
+def client(client):
+    for i in range(23):
+        fruit = "apple" if i % 2 else "pear"
+        client.post("/notes/create", data={"title": f"{fruit} {i}", "content": f"note {i}"})
+    client.post("/notes/pin/4")
+    return client
+
+
+def _ids(body):
+    return [int(i) for i in NOTE_ID_RE.findall(body)]
+
+
+@pytest.mark.parametrize("query, count", [("", 23), ("apple", 11), ("nothing", 0)])
+def test_streamed_dashboard_matches_buffered(app, client, query, count):
+    streamed = client.get(f"/notes/dashboard?q={query}").get_data(as_text=True)
+
+    app.config["DASHBOARD_STREAMING"] = False
+    buffered = client.get(f"/notes/dashboard?q={query}").get_data(as_text=True)
+
+    assert _ids(streamed) == _ids(buffered)
+    assert len(_ids(streamed)) == count
+    if count:
+        assert _ids(streamed)[0] == 4  # pinned first
+    else:
+        assert "No notes found" in streamed
+    assert "<!--flush-->" not in streamed
+
+
+def test_dashboard_is_sent_in_chunks(client):
+    r = client.get("/notes/dashboard", buffered=False)
+    chunks = [chunk.decode("utf-8") for chunk in r.response]
+    r.close()
+
+    # Page shell, then one chunk per 5 cards, then the rest of the page
+    assert "data-note-id" not in chunks[0]
+    assert [len(_ids(chunk)) for chunk in chunks[1:]] == [5, 5, 5, 5, 3]
+
+
+def test_write_while_stream_is_half_consumed(app, client):
+    writer = app.extensions["writer"]
+    r = client.get("/notes/dashboard", buffered=False)
+    chunks = iter(r.response)
+    seen = ""
+    while len(_ids(seen)) < 5:
+        seen += next(chunks).decode("utf-8")  # notes cursor now open mid-scan
+
+    other = app.test_client()
+    other.post("/auth/login", data={"username": "u", "password": "p"})
+    created = other.post("/notes/create", data={"title": "during", "content": "stream"})
+
+    seen += "".join(chunk.decode("utf-8") for chunk in chunks)
+    r.close()
+
+    assert created.status_code == 302
+    assert writer.stats["lock_errors"] == 0
+    assert writer.stats["failed_batches"] == 0
+    assert len(_ids(seen)) == 23
+    assert 24 in _ids(client.get("/notes/dashboard").get_data(as_text=True))
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from app_modules.profiler import SamplingProfiler, collapse
+
+
+@pytest.fixture
+def client(make_app):
+    app = make_app(
+        PROFILE_TOKEN="secret",
+        RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_BURST=5,
+        RATE_LIMIT_RATE=0.001,
+    )
+    return app.test_client()
+
+
+def test_ratelimit_counters_require_admin(client):
+    assert client.get("/debug/ratelimit").status_code == 403
+
+
+def test_ratelimit_counters_report_throttled_logins(client):
+    for _ in range(3):
+        client.post("/auth/login", data={"username": "x", "password": "y"})
+
+    r = client.get("/debug/ratelimit", headers={"X-Profile-Token": "secret"})
+    assert r.status_code == 200
+    assert r.json["admitted"]["auth.login"] == 1
+    assert r.json["throttled"]["auth.login"] == 2
+
+
+@pytest.fixture
+def profiling_app(make_app):
+    return make_app(PROFILE_TOKEN="secret", ADMIN_USERNAMES=["admin"], PROFILE_INTERVAL=0.001)
+
+
+def _login(app, username):
+    client = app.test_client()
+    client.post("/auth/register", data={"username": username, "password": "p", "confirm_password": "p"})
+    client.post("/auth/login", data={"username": username, "password": "p"})
+    return client
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "wrong"}, {"X-Profile-Token": ""}])
+def test_profile_denied_without_admin_or_token(profiling_app, headers):
+    anonymous = profiling_app.test_client()
+    assert anonymous.get("/debug/profile?seconds=0.1", headers=headers).status_code == 403
+
+    user = _login(profiling_app, "someone")
+    assert user.get("/debug/profile?seconds=0.1", headers=headers).status_code == 403
+
+
+def test_profile_denied_when_no_token_is_configured(make_app):
+    app = make_app(PROFILE_TOKEN="", ADMIN_USERNAMES=[])
+    r = app.test_client().get("/debug/profile?seconds=0.1", headers={"X-Profile-Token": ""})
+    assert r.status_code == 403
+
+
+def test_profile_allowed_for_admin_and_token(profiling_app):
+    admin = _login(profiling_app, "admin")
+    assert admin.get("/debug/profile?seconds=0.1").status_code == 200
+
+    r = profiling_app.test_client().get(
+        "/debug/profile?seconds=0.1", headers={"X-Profile-Token": "secret"}
+    )
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+    assert int(r.headers["X-Profile-Samples"]) > 0
+
+
+def test_profile_rejects_concurrent_runs(profiling_app):
+    profiler = profiling_app.extensions["profiler"]
+    with profiler._lock:
+        r = profiling_app.test_client().get(
+            "/debug/profile?seconds=0.1", headers={"X-Profile-Token": "secret"}
+        )
+    assert r.status_code == 409
+
+
+def _busy_until(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_samples_are_rooted_at_the_endpoint(profiling_app):
+    profiler = SamplingProfiler(interval=0.001)
+    stop = threading.Event()
+
+    def serve():
+        with profiling_app.test_request_context("/notes/dashboard"):
+            profiler.tag()
+            try:
+                _busy_until(stop)
+            finally:
+                profiler.untag()
+
+    worker = threading.Thread(target=serve, name="busy")
+    worker.start()
+    try:
+        samples, stacks = profiler.profile(0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert samples > 10
+    busy = [stack for stack in stacks if "test_debug.py:_busy_until" in stack]
+    assert busy and all(stack.startswith("notes.dashboard;") for stack in busy)
+
+    lines = collapse(stacks).splitlines()
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert counts == sorted(counts, reverse=True)
+    assert sum(counts) == sum(stacks.values())
+    assert not profiler._endpoints
@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(SYNC_INLINE_LIMIT=5)
+
+
+def test_large_sync_runs_as_job_and_drops_payload(app, client):
+    notes = [
+        {"title": f"n{i}", "content": "x", "created_at": f"2026-01-01T00:00:{i:02d}"}
+        for i in range(20)
+    ]
+    r = client.post("/notes/sync", json={"notes": notes})
+    assert r.status_code == 202
+    job_id = r.json["job_id"]
+
+    deadline = time.monotonic() + 10
+    while client.get(f"/jobs/{job_id}").json["status"] != "done":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    db = sqlite3.connect(app.config["DATABASE"])
+    assert db.execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone() == (None,)
+    assert db.execute("SELECT COUNT(*) FROM notes").fetchone() == (20,)
+
+
+def test_dispatch_does_not_hold_lock_while_claiming(app):
+    from app_modules.jobs import get_job_runner
+    from app_modules import get_writer
+
+    with app.app_context():
+        runner = get_job_runner()
+        runner.ensure_started()
+        writer = get_writer()
+
+    db = sqlite3.connect(app.config["DATABASE"])
+    db.execute(
+        "INSERT INTO jobs (user_id, kind, status, params) VALUES (1, 'sync', 'queued', '{}')"
+    )
+    db.commit()
+
+    # Keep the writer busy so the claim has to wait for it
+    release = threading.Event()
+    blocker = writer.submit(lambda db: release.wait(5))
+    dispatcher = threading.Thread(target=runner.dispatch)
+    dispatcher.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not runner._active:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        assert runner._lock.acquire(timeout=1)
+        runner._lock.release()
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+        dispatcher.join(timeout=5)
+
+    deadline = time.monotonic() + 5
+    while db.execute("SELECT status FROM jobs").fetchone()[0] != "done":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert not runner._active
+    db.close()
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from app_modules.loadtest import LoadClient, setup_users
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(app):
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+
+
+def test_setup_users_logs_everyone_in(app, serve):
+    clients, dropped = setup_users(serve(app), 3, 2)
+
+    assert len(clients) == 3
+    assert dropped == {}
+
+
+def test_wrong_credentials_are_not_a_login(app, serve):
+    client = LoadClient(serve(app), "nobody", "wrong")
+
+    ok, status, _ = client.login()
+
+    assert status == 200  # the login page, re-rendered
+    assert not ok
+
+
+def test_rate_limited_logins_are_reported(make_app, serve):
+    # auth.login costs 5 tokens: one login per client IP fits the burst
+    app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BURST=5, RATE_LIMIT_RATE=0.001)
+
+    clients, dropped = setup_users(serve(app), 3, 1)
+
+    assert len(clients) == 1
+    assert dropped == {"429": 2}
@@ -0,0 +1,47 @@
+import sqlite3
+
+from app_modules.maintenance import reclaim_free_pages, run_maintenance, _pragma
+
+
+def _db_with_free_pages(path, auto_vacuum="INCREMENTAL"):
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute(f"PRAGMA auto_vacuum = {auto_vacuum}")
+    db.execute("CREATE TABLE t (v BLOB)")
+    db.executemany("INSERT INTO t VALUES (?)", [(b"x" * 3000,)] * 1000)
+    db.execute("DELETE FROM t")
+    return db
+
+
+def test_one_step_frees_pages_per_step(tmp_path):
+    db = _db_with_free_pages(str(tmp_path / "t.db"))
+    free = _pragma(db, "freelist_count")
+    assert free > 500
+
+    reclaimed = reclaim_free_pages(db, pages_per_step=256, pause=0, max_steps=1)
+    assert reclaimed == 256
+    assert _pragma(db, "freelist_count") == free - 256
+
+    reclaim_free_pages(db, pages_per_step=256, pause=0)
+    assert _pragma(db, "freelist_count") == 0
+
+
+def test_maintain_does_not_vacuum_without_convert(tmp_path):
+    path = str(tmp_path / "t.db")
+    db = _db_with_free_pages(path, auto_vacuum="NONE")
+    free = _pragma(db, "freelist_count")
+    db.close()
+
+    lines = []
+    run_maintenance(path, pause=0, log=lines.append)
+
+    db = sqlite3.connect(path)
+    assert _pragma(db, "auto_vacuum") == 0
+    assert _pragma(db, "freelist_count") >= free - 5  # ANALYZE may use a few
+    assert any("--convert" in line for line in lines)
+
+    db.close()
+
+    run_maintenance(path, pause=0, convert=True, log=lines.append)
+    db = sqlite3.connect(path)
+    assert _pragma(db, "auto_vacuum") == 2
+    assert _pragma(db, "freelist_count") == 0
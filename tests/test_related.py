@@ -0,0 +1,131 @@
+import math
+from collections import Counter
+
+import pytest
+
+from app_modules.related import RelatedNotesCache, UserCorpus, tokenize
+
+
+CORPUS = {
+    1: ("Garden plan", "plant tomatoes and basil in the garden this spring"),
+    2: ("Tomato sauce", "tomatoes basil garlic olive oil, simmer the sauce"),
+    3: ("Spring garden", "garden beds, compost, spring planting schedule"),
+    4: ("Tax return", "receipts, invoices and the tax deadline"),
+    5: ("Invoices", "send invoices, chase receipts before the deadline"),
+    6: ("Empty", ""),
+    7: ("Basil", "basil basil basil"),
+}
+
+
+def brute_force_scores(corpus):
+    """Cosine similarity of (1 + log tf) * smoothed idf vectors, computed naively."""
+    docs = {}
+    for note_id, (title, content) in corpus.items():
+        counts = Counter(tokenize(f"{title} {content}"))
+        if counts:
+            docs[note_id] = counts
+
+    n = len(docs)
+    df = Counter(term for counts in docs.values() for term in counts)
+    vectors = {}
+    for note_id, counts in docs.items():
+        vec = {
+            term: (1 + math.log(c)) * (math.log((1 + n) / (1 + df[term])) + 1)
+            for term, c in counts.items()
+        }
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        vectors[note_id] = {term: v / norm for term, v in vec.items()}
+
+    scores = {}
+    for a, va in vectors.items():
+        for b, vb in vectors.items():
+            if a != b:
+                scores[a, b] = sum(v * vb.get(term, 0.0) for term, v in va.items())
+    return scores
+
+
+def _corpus(notes=CORPUS):
+    corpus = UserCorpus()
+    for note_id, (title, content) in notes.items():
+        corpus.set_note(note_id, title, content)
+    return corpus
+
+
+def test_scores_match_brute_force_cosine():
+    corpus = _corpus()
+    expected = brute_force_scores(CORPUS)
+
+    for note_id in CORPUS:
+        results = corpus.related(note_id, k=len(CORPUS))
+        if note_id == 6:
+            assert results == []  # no terms, no vector
+            continue
+
+        got = {r["id"]: r["score"] for r in results}
+        want = {
+            other: round(score, 4)
+            for (a, other), score in expected.items()
+            if a == note_id and score > 0
+        }
+        assert got == pytest.approx(want, abs=1e-4)
+        assert [r["score"] for r in results] == sorted(got.values(), reverse=True)
+
+
+def test_top_k_is_the_best_k():
+    corpus = _corpus()
+    full = corpus.related(1, k=10)
+    assert corpus.related(1, k=2) == full[:2]
+    assert corpus.related(1, k=1) == full[:1]
+
+
+def test_updates_invalidate_cached_results():
+    corpus = _corpus()
+    assert 5 in [r["id"] for r in corpus.related(4)]
+
+    corpus.set_note(5, "Holiday", "beach towel sunscreen")
+    assert 5 not in [r["id"] for r in corpus.related(4)]
+
+    corpus.set_note(5, "Invoices", "tax invoices")
+    assert corpus.related(4)[0]["id"] == 5
+
+    corpus.remove_note(5)
+    assert corpus.related(4) == []
+    assert corpus.related(5) == []
+
+
+def test_cache_applies_writes_without_tracking_unloaded_users():
+    cache = RelatedNotesCache()
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return [(i, title, content) for i, (title, content) in CORPUS.items()]
+
+    cache.note_saved(2, 1, "x", "y")  # nobody loaded: nothing tracked
+    assert cache._generations == {}
+
+    assert cache.related(1, 4, loader)[0]["id"] == 5
+    cache.note_saved(1, 8, "Deadline", "tax deadline invoices receipts")
+    assert 8 in [r["id"] for r in cache.related(1, 4, loader)]
+    assert loads == ["1"]
+
+
+def test_related_endpoint_clamps_k(client):
+    for i in range(55):
+        client.post("/notes/create", data={"title": f"shared {i}", "content": f"common words {i}"})
+
+    def count(k):
+        return len(client.get(f"/notes/api/related/1?k={k}").json)
+
+    assert count(0) == 1
+    assert count(3) == 3
+    assert count(1000) == 50
+
+
+def test_related_endpoint_sees_edits(client):
+    client.post("/notes/create", data={"title": "Garden", "content": "tomatoes basil"})
+    client.post("/notes/create", data={"title": "Sauce", "content": "tomatoes basil garlic"})
+    assert [r["id"] for r in client.get("/notes/api/related/1").json] == [2]
+
+    client.post("/notes/edit/2", data={"title": "Taxes", "content": "invoices receipts"})
+    assert client.get("/notes/api/related/1").json == []
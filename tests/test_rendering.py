@@ -0,0 +1,90 @@
+from html.parser import HTMLParser
+
+import pytest
+
+from app_modules.rendering import render_markdown
+
+
+ALLOWED_TAGS = {
+    "p", "br", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li",
+    "blockquote", "pre", "code", "hr", "strong", "em", "a",
+}
+VOID_TAGS = {"br", "hr"}
+
+
+class TagChecker(HTMLParser):
+    """Fails on unknown tags, unexpected attributes and misnesting."""
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+
+    def handle_starttag(self, tag, attrs):
+        assert tag in ALLOWED_TAGS, tag
+        names = {name for name, _ in attrs}
+        if tag == "a":
+            assert names == {"href", "rel"}, attrs
+        elif tag == "code":
+            assert names <= {"class"}, attrs
+        else:
+            assert not names, attrs
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        assert self.stack and self.stack[-1] == tag, (self.stack, tag)
+        self.stack.pop()
+
+
+def check(out):
+    assert "\x00" not in out
+    checker = TagChecker()
+    checker.feed(out)
+    checker.close()
+    assert not checker.stack, checker.stack
+
+
+@pytest.mark.parametrize("source, expected", [
+    # Raw HTML is shown as text
+    ("<script>alert(1)</script>", "<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>"),
+    ("<img src=x onerror=alert(1)>", "<p>&lt;img src=x onerror=alert(1)&gt;</p>"),
+    # Only safe URL schemes become links
+    ("[x](javascript:alert(1))", "<p>[x](javascript:alert(1))</p>"),
+    ("[x](JaVaScRiPt:alert(1))", "<p>[x](JaVaScRiPt:alert(1))</p>"),
+    ("[x](&#106;avascript:alert(1))", "<p>[x](&amp;#106;avascript:alert(1))</p>"),
+    ("[x](data:text/html,hi)", "<p>[x](data:text/html,hi)</p>"),
+    ("[x](//evil.example)", "<p>[x](//evil.example)</p>"),
+    ('[x](http://a"onmouseover="b)',
+     '<p><a href="http://a&quot;onmouseover=&quot;b" rel="nofollow noopener noreferrer">x</a></p>'),
+    # A code span in the URL is not a link, and leaks no placeholder
+    ("[x](http://a`y`)", "<p>[x](http://a<code>y</code>)</p>"),
+    ("[`c` *e*](/n)",
+     '<p><a href="/n" rel="nofollow noopener noreferrer"><code>c</code> <em>e</em></a></p>'),
+    # Emphasis nests properly
+    ("***c***", "<p><strong><em>c</em></strong></p>"),
+    ("*a **b** c*", "<p><em>a <strong>b</strong> c</em></p>"),
+    ("**a *b** c*", "<p><strong>a *b</strong> c*</p>"),
+    ("snake_case_name", "<p>snake_case_name</p>"),
+    ("`**not bold**`", "<p><code>**not bold**</code></p>"),
+    # Block edge cases
+    ("```\n<b>unterminated", "<pre><code>&lt;b&gt;unterminated</code></pre>"),
+    ('```"><script>\nx\n```',
+     "<p><code>`</code>&quot;&gt;&lt;script&gt;<br>\nx</p>\n<pre><code></code></pre>"),
+    ("a\x00b", "<p>ab</p>"),
+    ("", ""),
+])
+def test_render_table(source, expected):
+    out = render_markdown(source)
+    assert out == expected
+    check(out)
+
+
+@pytest.mark.parametrize("source", [
+    ">" * 5000 + " deep",
+    "*_" * 3000,
+    "**" * 3000 + "x",
+    "[" * 2000 + "](/a)",
+    "- a\n  b\n1. c\n> d\n# e\n---",
+])
+def test_render_adversarial_stays_well_formed(source):
+    check(render_markdown(source))
@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+
+from app_modules.models import create_note, create_user, update_note
+from app_modules.revisions import apply_delta, get_revision, make_delta, prune_revisions
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(REVISION_SNAPSHOT_INTERVAL=3)
+
+
+def _version(i):
+    lines = [f"line {j}\n" for j in range(40)]
+    lines[i] = f"edited {i}\n"
+    return "".join(lines)
+
+
+def _write_history(app, versions=8):
+    with app.app_context():
+        user_id = create_user("writer", "x")
+        note_id = create_note(user_id, "t0", _version(0))
+        for i in range(1, versions):
+            update_note(note_id, user_id, f"t{i}", _version(i))
+    return user_id, note_id
+
+
+def _kinds(app, note_id):
+    db = sqlite3.connect(app.config["DATABASE"])
+    rows = db.execute(
+        "SELECT revision, kind FROM note_revisions WHERE note_id = ? ORDER BY revision",
+        (note_id,),
+    ).fetchall()
+    db.close()
+    return rows
+
+
+@pytest.mark.parametrize("old, new", [
+    ("", ""),
+    ("", "new\ntext"),
+    ("gone\nentirely\n", ""),
+    ("a\nb\nc\n", "a\nB\nc\n"),
+    ("a\nb\nc", "a\nb\nc\nd"),           # no trailing newline
+    ("a\nb\n", "a\nb"),                  # trailing newline removed
+    ("x\n" * 50, "x\n" * 25 + "y\n" + "x\n" * 25),
+    ("héllo\r\nwörld\n", "héllo\r\n☃\nwörld\n"),
+    (None, "from nothing"),
+])
+def test_delta_round_trip(old, new):
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_revisions_reconstruct_across_snapshots(app):
+    user_id, note_id = _write_history(app)
+
+    assert [kind for _, kind in _kinds(app, note_id)] == [
+        "full", "delta", "delta", "full", "delta", "delta", "full", "delta",
+    ]
+    with app.app_context():
+        for revision in range(1, 9):
+            data = get_revision(note_id, user_id, revision)
+            assert data["title"] == f"t{revision - 1}"
+            assert data["content"] == _version(revision - 1)
+        assert get_revision(note_id, user_id, 9) is None
+
+
+def test_prune_rewrites_first_kept_delta_as_snapshot(app):
+    user_id, note_id = _write_history(app)
+    db = sqlite3.connect(app.config["DATABASE"])
+    db.execute(
+        "UPDATE note_revisions SET created_at = '2000-01-01 00:00:00' WHERE revision <= 5"
+    )
+    db.commit()
+    db.close()
+
+    with app.app_context():
+        # Revision 6 is a delta on snapshot 4, which is pruned
+        assert prune_revisions(keep_days=90, keep_min=3) == 5
+        assert _kinds(app, note_id) == [(6, "full"), (7, "full"), (8, "delta")]
+
+        assert get_revision(note_id, user_id, 5) is None
+        for revision in (6, 7, 8):
+            assert get_revision(note_id, user_id, revision)["content"] == _version(revision - 1)
+
+
+def test_restore_creates_a_new_revision(client):
+    client.post("/notes/create", data={"title": "v1", "content": "first"})
+    client.post("/notes/edit/1", data={"title": "v2", "content": "second"})
+
+    r = client.post("/notes/history/1/1/restore")
+    assert r.json == {"status": "success", "restored": 1}
+
+    history = client.get("/notes/history/1").json
+    assert [row["revision"] for row in history] == [3, 2, 1]
+    assert client.get("/notes/history/1/3").json["content"] == "first"
+    assert client.post("/notes/history/1/9/restore").status_code == 404
+
+
+def test_history_is_private(app, client):
+    client.post("/notes/create", data={"title": "mine", "content": "secret"})
+
+    other = app.test_client()
+    other.post("/auth/register", data={"username": "o", "password": "p", "confirm_password": "p"})
+    other.post("/auth/login", data={"username": "o", "password": "p"})
+
+    assert other.get("/notes/history/1/1").status_code == 404
+    assert other.post("/notes/history/1/1/restore").status_code == 404
+
+
+def test_synced_note_starts_history(client):
+    notes = [{"title": "local", "content": "from the browser", "created_at": "2026-01-01T00:00:00"}]
+    client.post("/notes/sync", json={"notes": notes})
+
+    assert client.get("/notes/history/1/1").json["content"] == "from the browser"
@@ -0,0 +1,85 @@
+from app_modules.suggest import PrefixIndex, SuggestIndexCache
+
+
+def _texts(results):
+    return [r["text"] for r in results]
+
+
+def test_prefix_index_add_replace_remove():
+    index = PrefixIndex()
+    index.add("note", 1, "Groceries")
+    index.add("note", 2, "grocery list")
+    index.add("category", 1, "Gardening")
+    index.add("note", 3, "  ")  # blank titles are not indexed
+
+    assert len(index) == 3
+    assert _texts(index.search("gro")) == ["Groceries", "grocery list"]
+    assert _texts(index.search("G", limit=2)) == ["Gardening", "Groceries"]
+    assert index.search("x") == []
+
+    index.add("note", 1, "Shopping")  # rename replaces the old entry
+    assert _texts(index.search("gro")) == ["grocery list"]
+
+    index.remove("note", 2)
+    index.remove("note", 99)  # unknown refs are ignored
+    assert index.search("gro") == []
+    assert len(index) == 2
+
+
+def test_cache_applies_writes_to_loaded_index():
+    cache = SuggestIndexCache()
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return [("note", 1, "alpha")]
+
+    assert _texts(cache.suggest(1, "a", loader)) == ["alpha"]
+    cache.add(1, "note", 2, "apple")
+    cache.remove(1, "note", 1)
+    assert _texts(cache.suggest(1, "a", loader)) == ["apple"]
+    assert loads == ["1"]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SuggestIndexCache(max_users=2)
+    loads = []
+
+    def loader(user_id):
+        loads.append(user_id)
+        return [("note", 1, f"title {user_id}")]
+
+    cache.suggest(1, "t", loader)
+    cache.suggest(2, "t", loader)
+    cache.suggest(1, "t", loader)  # 1 is now most recent
+    cache.suggest(3, "t", loader)  # evicts 2
+    cache.suggest(1, "t", loader)
+    cache.suggest(2, "t", loader)  # reloaded
+
+    assert loads == ["1", "2", "3", "2"]
+
+
+def test_cache_does_not_track_users_without_an_index():
+    cache = SuggestIndexCache()
+    for user_id in range(1000):
+        cache.add(user_id, "note", 1, "x")
+        cache.remove(user_id, "note", 1)
+
+    assert cache._generations == {}
+    assert not cache._indexes
+
+
+def test_write_during_build_triggers_rebuild():
+    cache = SuggestIndexCache()
+    rows = [("note", 1, "old")]
+
+    def loader(user_id):
+        snapshot = list(rows)
+        if len(rows) == 1:
+            # A write commits after the DB read but before the index is installed
+            rows.append(("note", 2, "new"))
+            cache.add(user_id, "note", 2, "new")
+        return snapshot
+
+    assert _texts(cache.suggest(1, "", loader)) == ["new", "old"]
+    assert cache._generations == {}
@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app_modules.writer import WriteQueue, WriteTimeout
+
+
+@pytest.fixture
+def writer(tmp_path):
+    path = str(tmp_path / "w.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE t (v INTEGER)")
+    db.commit()
+    db.close()
+
+    queue = WriteQueue(path, max_latency=0, result_timeout=5)
+    yield queue
+    queue.close()
+
+
+def _insert(db, v):
+    db.execute("INSERT INTO t (v) VALUES (?)", (v,))
+    return v
+
+
+def test_failed_op_rolls_back_only_itself(writer):
+    def bad(db):
+        db.execute("INSERT INTO t (v) VALUES (99)")
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        writer.execute(bad)
+    assert writer.execute(_insert, 1) == 1
+    rows = writer.execute(lambda db: db.execute("SELECT v FROM t").fetchall())
+    assert [row["v"] for row in rows] == [1]
+
+
+def test_batch_failure_keeps_writer_alive(writer):
+    # Ending the transaction behind the writer's back makes the
+    # ROLLBACK TO that follows the op's exception fail as well, like
+    # SQLite does itself on SQLITE_FULL/IOERR.
+    def aborts_transaction(db):
+        db.execute("ROLLBACK")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(sqlite3.OperationalError):
+        writer.execute(aborts_transaction)
+
+    assert writer._thread.is_alive()
+    assert writer.stats["failed_batches"] == 1
+    assert writer.execute(_insert, 2) == 2
+
+
+def test_timed_out_write_is_cancelled_not_applied(tmp_path):
+    path = str(tmp_path / "w.db")
+    sqlite3.connect(path).execute("CREATE TABLE t (v INTEGER)")
+    queue = WriteQueue(path, max_batch=1, max_latency=0, result_timeout=0.2)
+    release = threading.Event()
+    try:
+        blocker = queue.submit(lambda db: release.wait(5))
+        with pytest.raises(WriteTimeout):
+            queue.execute(_insert, 1)
+        release.set()
+        blocker.result(timeout=5)
+
+        rows = queue.execute(lambda db: db.execute("SELECT v FROM t").fetchall())
+        assert rows == []
+        assert queue.stats["timeouts"] == 1
+    finally:
+        release.set()
+        queue.close()
+
+
+def test_open_read_cursor_does_not_block_commit(writer):
+    writer.execute(lambda db: db.executemany("INSERT INTO t (v) VALUES (?)", [(i,) for i in range(500)]))
+    writer.timeout = 0.5
+
+    reader = sqlite3.connect(writer.database)
+    cursor = reader.execute("SELECT v FROM t")
+    assert len(cursor.fetchmany(10)) == 10  # statement left open mid-scan
+
+    assert writer.execute(_insert, 1000) == 1000
+    assert writer.stats["lock_errors"] == 0
+    assert len(cursor.fetchall()) == 490
+    reader.close()